@@ -0,0 +1,182 @@
+"""
+Versi async endpoint baca yang paling sering dipanggil (search & detail sepatu).
+
+Dipakai kalau settings.ASYNC_READ_VIEWS nyala dan server jalan di ASGI
+(backend/asgi.py). Bedanya sama versi di views.py: pengambilan data yang gak
+saling tergantung (status favorit, ringkasan rating, halaman review, sepatu
+serupa) dijalankan BARENGAN pakai asyncio.gather, jadi waktu responsnya kira-kira
+sama dengan satu panggilan yang paling lambat, bukan totalnya.
+
+Tiap panggilan jalan di thread pool KECIL per proses (settings.ASYNC_DB_THREADS
+thread), bukan executor default event loop yang bisa sampai 32 thread. Tiap thread
+pegang koneksi Postgres sendiri, jadi jumlah thread = batas koneksi per worker.
+start.sh juga mematikan koneksi persisten (DB_CONN_MAX_AGE=0) di mode uvicorn.
+Format response sama persis dengan versi sync.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from . import catalog, favorites, ratings, reviews, search, shoe_payloads, similar
+from .authentication import get_token_user
+from .conditional import compute_etag, is_not_modified, patch_cache_headers
+
+
+def _with_connection(func):
+    """Buang koneksi DB yang udah basi/rusak sebelum & sesudah jalan di thread pool."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Sama kayak api/jobs.py: thread pool gak ikut ke proses hasil fork, bikin per proses
+    global _executor, _executor_pid
+    if _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='async-db')
+                _executor_pid = os.getpid()
+    return _executor
+
+
+async def run_in_thread(func, *args, **kwargs):
+    call = sync_to_async(_with_connection(func), thread_sensitive=False, executor=_get_executor())
+    return await call(*args, **kwargs)
+
+
+async def authenticate(request):
+    """
+    Sama kayak CachedTokenAuthentication: header "Authorization: Token <key>".
+    Set request.user, return JsonResponse 401 kalau token-nya salah (None kalau aman).
+    """
+    request.user = AnonymousUser()
+    header = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if not header or header[0].lower() != 'token':
+        return None
+    if len(header) != 2:
+        return JsonResponse({'detail': 'Invalid token header.'}, status=401)
+
+    result = await run_in_thread(get_token_user, header[1])
+    if result is None:
+        return JsonResponse({'detail': 'Invalid token.'}, status=401)
+    user, _ = result
+    if not user.is_active:
+        return JsonResponse({'detail': 'User inactive or deleted.'}, status=401)
+    request.user = user
+    return None
+
+
+# --- 1. SEARCH SHOES (async) ---
+@require_GET
+async def search_shoes(request):
+    error = await authenticate(request)
+    if error:
+        return error
+    query = request.GET.get('q', '')
+    if not query:
+        return JsonResponse([], safe=False)
+
+    try:
+        shoes_data = await run_in_thread(lambda: search.search(catalog.get_snapshot(), query))
+        shoe_ids = [shoe['shoe_id'] for shoe in shoes_data]
+
+        # Favorit & rating gak saling tunggu
+        calls = [run_in_thread(ratings.get_rating_map, shoe_ids)]
+        if request.user.is_authenticated:
+            calls.append(run_in_thread(favorites.favorite_ids, request.user.id, shoe_ids))
+        rating_map, *user_favorites = await asyncio.gather(*calls, return_exceptions=True)
+        if isinstance(rating_map, Exception):
+            rating_map = {}
+        user_favorites = user_favorites[0] if user_favorites and not isinstance(user_favorites[0], Exception) else set()
+
+        final_results = [{
+            'id': shoe.get('shoe_id'),  # sama kayak versi sync: PK tabel shoes = shoe_id
+            'shoe_id': shoe.get('shoe_id'),
+            'name': shoe.get('name'),
+            'brand': shoe.get('brand'),
+            'img_url': shoe.get('img_url'),
+            'slug': shoe.get('slug'),
+            'rating': rating_map.get(shoe.get('shoe_id'), 0),
+            'isFavorite': shoe.get('shoe_id') in user_favorites,
+        } for shoe in shoes_data]
+        return JsonResponse(final_results, safe=False, status=200)
+    except Exception:
+        return JsonResponse({'error': 'Search failed. Try again later.'}, status=500)
+
+
+def _similar_block(snapshot, shoe_id):
+    return [{
+        'shoe_id': similar_shoe['shoe_id'],
+        'name': similar_shoe.get('name'),
+        'brand': similar_shoe.get('brand'),
+        'img_url': similar_shoe.get('img_url'),
+        'slug': similar_shoe.get('slug'),
+    } for similar_shoe in similar.similar_to(snapshot, shoe_id)]
+
+
+# --- 2. GET SHOE DETAIL (async) ---
+@require_GET
+async def get_shoe_detail(request, slug):
+    error = await authenticate(request)
+    if error:
+        return error
+
+    etag = await run_in_thread(compute_etag, request, per_user=True)
+    if is_not_modified(request, etag):
+        return patch_cache_headers(HttpResponse(status=304), request, etag, per_user=True)
+
+    snapshot = await run_in_thread(catalog.get_snapshot)
+    shoe = snapshot.by_slug.get(slug)
+    if shoe is None:
+        return JsonResponse({'error': 'No shoes found.'}, status=404)
+    shoe_id = shoe['shoe_id']
+
+    calls = [
+        run_in_thread(ratings.get_summaries, [shoe_id]),
+        run_in_thread(reviews.get_page, shoe_id),
+        run_in_thread(_similar_block, snapshot, shoe_id),
+    ]
+    if request.user.is_authenticated:
+        calls.append(run_in_thread(favorites.is_favorite, request.user.id, shoe_id))
+    summaries, review_page, similar_shoes, *is_favorite = await asyncio.gather(*calls, return_exceptions=True)
+
+    response_data = {}
+    response_data['isFavorite'] = bool(is_favorite) and is_favorite[0] is True
+
+    if isinstance(summaries, Exception) or isinstance(review_page, Exception):
+        response_data['reviews'] = []
+        response_data['reviews_next_cursor'] = None
+        response_data['rating'] = 0
+    else:
+        summary = summaries.get(shoe_id)
+        response_data['rating'] = summary.average if summary else 0
+        response_data['rating_summary'] = {
+            'count': summary.review_count if summary else 0,
+            'histogram': summary.histogram if summary else {str(star): 0 for star in ratings.STARS},
+        }
+        response_data['reviews'], response_data['reviews_next_cursor'] = review_page
+
+    response_data['similar'] = [] if isinstance(similar_shoes, Exception) else similar_shoes
+
+    body = shoe_payloads.render(snapshot, shoe, response_data)
+    return patch_cache_headers(HttpResponse(body, content_type='application/json'), request, etag, per_user=True)
@@ -0,0 +1,29 @@
+"""
+Job Supabase Auth yang ngirim email (OTP signup, resend, reset password).
+Di-enqueue dari views lewat api/jobs.py, jadi worker web gak nunggu provider email.
+"""
+from . import jobs, supabase_client
+
+
+@jobs.task('send_signup_otp')
+def send_signup_otp(email, password):
+    res = supabase_client.supabase.auth.sign_up({
+        "email": email,
+        "password": password,
+    })
+    # Email sudah terdaftar di sistem OTP Supabase tapi belum verified
+    if res.user and getattr(res.user, 'identities', []) == []:
+        raise jobs.JobFailed('Email ini sudah terdaftar di sistem OTP.')
+    return {'message': 'Kode OTP telah dikirim ke email!'}
+
+
+@jobs.task('resend_signup_otp')
+def resend_signup_otp(email):
+    supabase_client.supabase.auth.resend({"type": "signup", "email": email})
+    return {'message': 'OTP resent successfully!'}
+
+
+@jobs.task('send_password_reset')
+def send_password_reset(email, redirect_url):
+    supabase_client.supabase.auth.reset_password_email(email, options={'redirect_to': redirect_url})
+    return {'message': 'Link reset password has been sent to your email.'}
@@ -0,0 +1,113 @@
+"""
+TokenAuthentication DRF + cache token -> user di memori worker.
+
+Tanpa cache, tiap request yang login nge-query authtoken_token JOIN user. Di sini
+hasilnya disimpan di LRU + TTL (settings.TOKEN_AUTH_CACHE_SIZE / _TTL), jadi
+request berikutnya dengan token yang sama gak nyentuh database.
+
+Revocation tetap langsung berlaku di semua worker: tiap entry nyimpen versi token
+itu (api/versions.py). Logout (token dihapus) dan perubahan user (ganti password,
+dinonaktifkan) naikin versinya lewat api/signals.py, jadi entry lama langsung
+dianggap basi dan token dicek ulang ke database.
+
+Versi per token cuma dibuat buat token yang valid, dan umurnya terbatas
+(TOKEN_VERSION_TTL), jadi token ngasal gak bisa ngisi cache 'state'. Kalau versinya
+udah expire, entry lokal ikut dianggap basi (cuma jadi satu query lagi).
+"""
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from . import versions
+from .models import User
+
+_entries = TTLCache(maxsize=settings.TOKEN_AUTH_CACHE_SIZE, ttl=settings.TOKEN_AUTH_CACHE_TTL)
+_lock = threading.Lock()
+
+# Minimal selama umur entry lokal, biar versinya gak hilang duluan
+TOKEN_VERSION_TTL = 2 * settings.TOKEN_AUTH_CACHE_TTL
+
+
+def version_name(key):
+    return f'token:{key}'
+
+
+def _snapshot(instance):
+    """Simpan nilai kolom aja, bukan instance-nya (biar gak ada state yang kebawa antar request)."""
+    fields = [field.attname for field in instance._meta.concrete_fields]
+    return fields, [getattr(instance, name) for name in fields]
+
+
+def _restore(model, snapshot):
+    fields, values = snapshot
+    return model.from_db(router.db_for_read(model), fields, values)
+
+
+def get_token_user(key):
+    """
+    Return (user, token) untuk key ini, atau None kalau token-nya gak ada.
+    Instance yang dikembalikan selalu baru, aman diubah-ubah sama view.
+    """
+    name = version_name(key)
+    with _lock:
+        entry = _entries.get(key)
+    # Versi cuma dibaca (gak pernah di-seed) sebelum token-nya terbukti valid
+    version = versions.peek_version(name)
+    if entry is not None and version is not None and entry[0] == version:
+        user = _restore(User, entry[1])
+        token = _restore(Token, entry[2])
+        token.user = user
+        return user, token
+
+    # Versi di atas dibaca SEBELUM query: kalau ada revoke di tengah-tengah, entry
+    # yang disimpan di bawah langsung basi
+    try:
+        token = Token.objects.select_related('user').get(key=key)
+    except Token.DoesNotExist:
+        with _lock:
+            _entries.pop(key, None)
+        return None
+
+    if version is None:
+        # Belum ada versi: seed sekarang. Kalau key-nya keburu dibikin revoke di
+        # tengah-tengah query, hasil query ini gak disimpan
+        version = versions.create_version(name, timeout=TOKEN_VERSION_TTL)
+    with _lock:
+        if version is None:
+            _entries.pop(key, None)
+        else:
+            _entries[key] = (version, _snapshot(token.user), _snapshot(token))
+    return token.user, token
+
+
+def revoke(key):
+    """Token ini harus dicek ulang ke database di semua worker."""
+    versions.bump_version(version_name(key), timeout=TOKEN_VERSION_TTL)
+
+
+def revoke_user(user_id):
+    """Data user berubah -> semua token miliknya dicek ulang."""
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        revoke(key)
+
+
+def clear_cache():
+    with _lock:
+        _entries.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        result = get_token_user(key)
+        if result is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        user, token = result
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return user, token
@@ -0,0 +1,151 @@
+"""
+Cek "username / email udah dipakai belum?" dengan Bloom filter di memori worker.
+
+Bloom filter isinya username & email (dinormalisasi) semua user. Kalau filternya
+bilang "gak ada", itu PASTI gak ada -> langsung jawab tanpa query. Kalau bilang
+"mungkin ada" (bisa false positive ~settings.USER_BLOOM_ERROR_RATE), baru dicek
+pasti ke database. Bot signup yang nyoba-nyoba nama random hampir selalu kena
+jalur pertama.
+
+Biar worker lain gak ketinggalan user baru (false negative = bahaya), filter
+nyimpen dua versi bersama (api/versions.py):
+- USERS_VERSION naik tiap ada user baru -> worker cukup nambahin user baru (satu
+  query kecil). Id user gak commit berurutan (id 10 bisa commit setelah id 11),
+  jadi yang di-query mundur settings.USER_BLOOM_CATCHUP_WINDOW id dari id terbesar
+  yang pernah kelihatan, bukan cuma id > terbesar.
+- REBUILD_VERSION naik kalau username/email user lama diubah -> bangun ulang
+
+Filter ini cuma jalan pintas buat jawaban "belum dipakai". Penjaga terakhirnya
+tetap unique constraint di tabel users.
+"""
+import math
+import threading
+
+import mmh3
+from django.conf import settings
+from django.db import transaction
+
+from . import versions
+from .models import User
+
+USERS_VERSION = 'users'
+REBUILD_VERSION = 'users:rebuild'
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(int(capacity), 1)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k posisi dari dua hash 64-bit (satu panggilan mmh3)
+        h1, h2 = mmh3.hash64(item, signed=False)
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        new = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        # Item yang udah ada (misal ke-query ulang waktu catch-up) gak dihitung dua kali
+        self.count += new
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def normalize(value):
+    return (value or '').strip().lower()
+
+
+def _username_key(username):
+    return 'u:' + normalize(username)
+
+
+def _email_key(email):
+    return 'e:' + normalize(email)
+
+
+class _Index:
+    def __init__(self, rows, version):
+        rows = list(rows)
+        self.version = version
+        self.max_id = 0
+        # 2 item per user (username + email), sisain ruang buat user baru
+        self.bloom = BloomFilter(max(settings.USER_BLOOM_CAPACITY, 4 * len(rows)), settings.USER_BLOOM_ERROR_RATE)
+        self.add_rows(rows)
+
+    def add_rows(self, rows, from_query=True):
+        for user_id, username, email in rows:
+            self.bloom.add(_username_key(username))
+            self.bloom.add(_email_key(email))
+            if from_query:
+                # Cuma id dari query yang jadi patokan catch-up; user yang ditambah lokal
+                # (user_created) bisa lebih besar dari id lain yang belum commit
+                self.max_id = max(self.max_id, user_id)
+
+    @property
+    def full(self):
+        return self.bloom.count >= self.bloom.capacity
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _user_rows(**filters):
+    return User.objects.filter(**filters).values_list('id', 'username', 'email').iterator()
+
+
+def get_index():
+    """Filter yang up to date (bangun / tambahin user baru kalau versinya berubah)."""
+    global _index
+    current = versions.get_versions(USERS_VERSION, REBUILD_VERSION)
+    version = (current[USERS_VERSION], current[REBUILD_VERSION])
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _lock:
+        index = _index
+        if index is None or index.version[1] != version[1] or index.full:
+            index = _Index(_user_rows(), version)
+        elif index.version != version:
+            index.add_rows(_user_rows(id__gt=max(index.max_id - settings.USER_BLOOM_CATCHUP_WINDOW, 0)))
+            index.version = version
+        _index = index
+        return index
+
+
+def username_taken(username):
+    if _username_key(username) not in get_index().bloom:
+        return False  # pasti belum ada, gak perlu query
+    return User.objects.filter(username=username).exists()
+
+
+def email_taken(email, iexact=False):
+    if _email_key(email) not in get_index().bloom:
+        return False
+    lookup = 'email__iexact' if iexact else 'email'
+    return User.objects.filter(**{lookup: email}).exists()
+
+
+def user_created(user):
+    """
+    Dipanggil dari signal: masukin ke filter worker ini, lalu kabarin worker lain
+    SETELAH commit (kalau sebelum, worker lain bisa query duluan dan kelewat user ini).
+    """
+    with _lock:
+        if _index is not None:
+            _index.add_rows([(user.id, user.username, user.email)], from_query=False)
+    transaction.on_commit(lambda: versions.bump_version(USERS_VERSION))
+
+
+def user_changed(user):
+    """Username/email user lama mungkin berubah -> semua worker bangun ulang filter."""
+    transaction.on_commit(lambda: versions.bump_version(REBUILD_VERSION))
@@ -0,0 +1,145 @@
+"""
+Cache katalog sepatu di memori worker.
+
+Tabel `shoes` jarang berubah, jadi isinya cukup dibaca sekali per worker (lewat
+koneksi Postgres Django yang di-reuse, bukan HTTP ke PostgREST) lalu disimpan
+sebagai snapshot. Snapshot kadaluarsa setelah settings.CATALOG_CACHE_TTL
+detik, atau lebih cepat kalau ada yang memanggil invalidate() (signal Shoe,
+`python manage.py invalidate_catalog`).
+
+Kalau snapshot basi, cuma SATU request yang refresh ke database; request lain tetap
+dilayani pakai snapshot lama sampai yang baru siap (anti stampede).
+
+PENTING: baris di snapshot dipakai bareng semua request. Jangan diubah langsung,
+copy dulu (dict(shoe)) kalau mau nambah field.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+
+from . import versions
+from .models import Shoe
+
+VERSION_NAME = 'catalog'
+
+
+class CatalogSnapshot:
+    """Isi tabel shoes pada satu waktu + index turunan yang dibangun dari situ."""
+
+    def __init__(self, shoes, generation=0):
+        self.shoes = tuple(shoes)
+        self.by_id = {shoe['shoe_id']: shoe for shoe in self.shoes}
+        self.by_slug = {shoe['slug']: shoe for shoe in self.shoes if shoe.get('slug')}
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        # Versi berdasarkan isi data, jadi refresh karena TTL yang isinya sama gak ganti versi
+        digest = hashlib.sha1(json.dumps(self.shoes, sort_keys=True, default=str).encode())
+        self.version = digest.hexdigest()[:16]
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.shoes)
+
+    def derived(self, name, builder):
+        """
+        Struktur turunan (index search, matrix fitur, dst) yang dibangun sekali per
+        snapshot. Begitu katalog ganti, snapshot baru otomatis bangun ulang semuanya.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+
+def load_shoes():
+    """Baca semua baris tabel shoes (urut shoe_id) dalam satu query ORM."""
+    return list(Shoe.objects.order_by('shoe_id').values())
+
+
+class CatalogCache:
+    def __init__(self, loader=load_shoes, ttl=None, generation_poll=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.generation_poll = generation_poll
+        self._snapshot = None
+        self._expires_at = 0
+        self._generation_checked_at = 0
+        self._refresh_lock = threading.Lock()
+
+    def _ttl(self):
+        return self.ttl if self.ttl is not None else settings.CATALOG_CACHE_TTL
+
+    def _poll_interval(self):
+        if self.generation_poll is not None:
+            return self.generation_poll
+        return settings.CATALOG_GENERATION_POLL
+
+    def _is_fresh(self, snapshot, now):
+        if now >= self._expires_at:
+            return False
+        # Cek versi bersama (invalidate dari proses lain), tapi gak tiap request
+        if now - self._generation_checked_at >= self._poll_interval():
+            self._generation_checked_at = now
+            if versions.get_version(VERSION_NAME) != snapshot.generation:
+                return False
+        return True
+
+    def _refresh(self):
+        generation = versions.get_version(VERSION_NAME)
+        snapshot = CatalogSnapshot(self.loader(), generation)
+        now = time.monotonic()
+        self._snapshot = snapshot
+        self._expires_at = now + self._ttl()
+        self._generation_checked_at = now
+        return snapshot
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh(snapshot, time.monotonic()):
+            return snapshot
+
+        if snapshot is None:
+            # Belum pernah load: semua request terpaksa nunggu load pertama
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    return self._refresh()
+                return self._snapshot
+
+        # Snapshot basi: yang dapat lock refresh, sisanya pakai snapshot lama
+        if not self._refresh_lock.acquire(blocking=False):
+            return snapshot
+        try:
+            if self._snapshot is not snapshot:
+                return self._snapshot  # udah di-refresh request lain barusan
+            try:
+                return self._refresh()
+            except Exception:
+                # Database lagi error: tetap layani data lama, coba lagi nanti
+                self._expires_at = time.monotonic() + min(self._ttl(), 30)
+                return snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self):
+        """Tandai snapshot basi di worker ini + semua worker lain (lewat versi bersama)."""
+        versions.bump_version(VERSION_NAME)
+        self._expires_at = 0
+
+
+catalog_cache = CatalogCache()
+
+
+def get_snapshot():
+    return catalog_cache.get()
+
+
+def invalidate():
+    catalog_cache.invalidate()
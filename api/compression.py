@@ -0,0 +1,126 @@
+"""
+Kompresi response (brotli / gzip) sesuai Accept-Encoding client.
+
+- Response di bawah settings.COMPRESSION_MIN_SIZE byte gak dikompres (gak sebanding).
+- Cuma tipe teks (JSON, HTML, dst) yang dikompres. Streaming (export NDJSON) &
+  file statis (udah diurus WhiteNoise) dilewati.
+- Response katalog yang publik dan punya ETag (lihat api/conditional.py) isinya
+  sama buat semua orang selama versinya sama, jadi hasil kompresinya disimpan di
+  memori worker per (ETag, encoding). Request berikutnya tinggal ambil bytes-nya,
+  gak kompres ulang. Karena cuma dibayar sekali, level kompresinya dinaikkan.
+"""
+import gzip
+import threading
+
+import brotli
+from cachetools import LRUCache
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+# Urutan preferensi kalau client nerima dua-duanya dengan q yang sama
+ENCODINGS = ('br', 'gzip')
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+# (level per request, level buat yang disimpan)
+GZIP_LEVELS = (6, 9)
+BROTLI_QUALITIES = (4, 9)
+
+
+def parse_accept_encoding(header):
+    """'gzip;q=0.5, br' -> {'gzip': 0.5, 'br': 1.0}"""
+    codings = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def choose_encoding(header):
+    """Encoding terbaik yang diterima client, atau None (kirim apa adanya)."""
+    codings = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = codings.get(encoding, codings.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(content, encoding, cached=False):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITIES[cached])
+    # mtime=0 biar hasilnya sama persis tiap kali (deterministik)
+    return gzip.compress(content, compresslevel=GZIP_LEVELS[cached], mtime=0)
+
+
+_variants = LRUCache(maxsize=settings.COMPRESSION_CACHE_BYTES, getsizeof=len)
+_lock = threading.Lock()
+
+
+def get_variant(content, encoding, etag):
+    """Versi terkompres yang disimpan per ETag (dikompres sekali per worker)."""
+    key = (etag, encoding, len(content))
+    with _lock:
+        body = _variants.get(key)
+    if body is None:
+        body = compress(content, encoding, cached=True)
+        if len(body) <= _variants.maxsize:
+            with _lock:
+                _variants[key] = body
+    return body
+
+
+def clear_cache():
+    with _lock:
+        _variants.clear()
+
+
+def _is_shared(response):
+    cache_control = response.get('Cache-Control', '')
+    return response.has_header('ETag') and 'public' in cache_control and 'private' not in cache_control
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.status_code != 200 or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if _is_shared(response):
+            body = get_variant(response.content, encoding, response['ETag'])
+        else:
+            body = compress(response.content, encoding)
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # Sama kayak GZipMiddleware Django: ETag kuat jadi lemah karena byte-nya beda
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
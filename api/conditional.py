@@ -0,0 +1,77 @@
+"""
+Conditional GET (ETag / If-None-Match / 304) untuk endpoint katalog.
+
+ETag dihitung dari versi snapshot katalog (di memori) + versi rating summary
+(cache bersama, lihat api/versions.py), jadi pengecekan If-None-Match gak butuh
+query Supabase/ORM sama sekali. Kalau cocok, view-nya gak dijalankan.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+
+from . import catalog, favorites, ratings, versions
+
+
+def _parse_if_none_match(header):
+    if not header:
+        return set()
+    if header.strip() == '*':
+        return {'*'}
+    return {tag.strip() for tag in header.split(',')}
+
+
+def compute_etag(request, per_user=False):
+    names = [ratings.VERSION_NAME]
+    user_part = ''
+    if per_user and request.user.is_authenticated:
+        user_part = str(request.user.id)
+        names.append(favorites.version_name(request.user.id))
+    shared = versions.get_versions(*names)
+
+    parts = [
+        request.get_full_path(),
+        catalog.get_snapshot().version,
+        *(str(shared[name]) for name in names),
+        user_part,
+    ]
+    return 'W/"%s"' % hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+
+
+def is_not_modified(request, etag):
+    if_none_match = _parse_if_none_match(request.META.get('HTTP_IF_NONE_MATCH'))
+    return etag in if_none_match or '*' in if_none_match
+
+
+def patch_cache_headers(response, request, etag, per_user=False):
+    response['ETag'] = etag
+    if per_user and request.user.is_authenticated:
+        # Isinya khusus user ini: jangan disimpan CDN, browser wajib revalidate
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    else:
+        response['Cache-Control'] = f'public, max-age={settings.CATALOG_HTTP_MAX_AGE}'
+    if per_user:
+        patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def conditional_catalog(per_user=False):
+    """
+    Decorator untuk view GET katalog (pasang di bawah @api_view / @permission_classes).
+    per_user=True kalau response-nya tergantung user (misal isFavorite).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = compute_etag(request, per_user=per_user)
+            if is_not_modified(request, etag):
+                response = Response(status=304)
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return patch_cache_headers(response, request, etag, per_user=per_user)
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+"""
+Filter + facet count server-side untuk katalog sepatu.
+
+Untuk tiap nilai facet (misal terrain=light) disimpan bitmap (pyroaring) berisi
+posisi sepatu di snapshot katalog. Kombinasi filter = operasi OR/AND antar bitmap,
+hitung facet = intersection_cardinality, jadi tetap murah walaupun filternya banyak.
+
+Format query:
+    ?terrain=light,moderate&pace=tempo     -> OR di dalam grup, AND antar grup
+    ?waterproof=true
+    ?weight_lab_oz_min=6&weight_lab_oz_max=9
+    ?sort=rating | -rating | weight | -weight
+"""
+from bisect import bisect_left, bisect_right
+
+from pyroaring import BitMap, FrozenBitMap
+
+# grup facet -> {nilai di query string: kolom di tabel shoes}
+FACET_GROUPS = {
+    'terrain': {'light': 'terrain_light', 'moderate': 'terrain_moderate', 'technical': 'terrain_technical'},
+    'pace': {'daily_running': 'pace_daily_running', 'tempo': 'pace_tempo', 'competition': 'pace_competition'},
+    'plate': {'rock_plate': 'plate_rock_plate', 'carbon_plate': 'plate_carbon_plate'},
+    'season': {'summer': 'season_summer', 'winter': 'season_winter', 'all': 'season_all'},
+    'arch': {'neutral': 'arch_neutral', 'stability': 'arch_stability'},
+    'waterproof': {'true': 'waterproof'},
+}
+
+RANGE_FIELDS = ('weight_lab_oz', 'drop_lab_mm', 'heel_lab_mm', 'forefoot_lab_mm', 'lug_dept_mm')
+
+SORT_FIELDS = {'rating': 'rating', 'weight': 'weight_lab_oz'}
+
+
+class FilterError(ValueError):
+    pass
+
+
+class FacetIndex:
+    def __init__(self, snapshot):
+        self.shoes = snapshot.shoes
+        self.all = FrozenBitMap(range(len(self.shoes)))
+
+        self.bitmaps = {}
+        for group, values in FACET_GROUPS.items():
+            for value, column in values.items():
+                self.bitmaps[(group, value)] = FrozenBitMap(
+                    i for i, shoe in enumerate(self.shoes) if shoe.get(column)
+                )
+
+        # Untuk range: posisi sepatu diurutkan berdasarkan nilainya (yang kosong dibuang)
+        self.ranges = {}
+        for field in RANGE_FIELDS:
+            pairs = sorted((shoe[field], i) for i, shoe in enumerate(self.shoes) if shoe.get(field) is not None)
+            self.ranges[field] = ([value for value, _ in pairs], [i for _, i in pairs])
+
+    def group_bitmap(self, group, values):
+        """OR semua nilai yang dipilih dalam satu grup."""
+        result = BitMap()
+        for value in values:
+            result |= self.bitmaps[(group, value)]
+        return result
+
+    def range_bitmap(self, field, low=None, high=None):
+        values, positions = self.ranges[field]
+        start = 0 if low is None else bisect_left(values, low)
+        end = len(values) if high is None else bisect_right(values, high)
+        return BitMap(positions[start:end])
+
+    def apply(self, selected, ranges):
+        """
+        selected: {grup: [nilai, ...]}, ranges: {kolom: (min, max)}.
+        Return (bitmap hasil, hitungan facet).
+
+        Hitungan facet pakai gaya "disjunctive": angka di grup X dihitung dengan
+        semua filter KECUALI filter grup X sendiri, jadi user tetap lihat berapa
+        hasil yang didapat kalau nambah pilihan lain di grup yang sama.
+        """
+        base = BitMap(self.all)
+        for field, (low, high) in ranges.items():
+            base &= self.range_bitmap(field, low, high)
+
+        group_bitmaps = {group: self.group_bitmap(group, values) for group, values in selected.items() if values}
+
+        result = BitMap(base)
+        for bitmap in group_bitmaps.values():
+            result &= bitmap
+
+        counts = {}
+        for group, values in FACET_GROUPS.items():
+            others = BitMap(base)
+            for other_group, bitmap in group_bitmaps.items():
+                if other_group != group:
+                    others &= bitmap
+            counts[group] = {value: others.intersection_cardinality(self.bitmaps[(group, value)]) for value in values}
+        return result, counts
+
+
+def get_index(snapshot):
+    return snapshot.derived('facets', FacetIndex)
+
+
+def parse_params(params):
+    """Ambil filter dari query string -> (selected, ranges, sort). Raise FilterError kalau salah."""
+    selected = {}
+    for group in FACET_GROUPS:
+        raw = params.get(group)
+        if raw:
+            values = [value.strip().lower() for value in raw.split(',') if value.strip()]
+            unknown = [value for value in values if value not in FACET_GROUPS[group]]
+            if unknown:
+                raise FilterError(f"Unknown {group} filter: {', '.join(unknown)}")
+            selected[group] = values
+
+    ranges = {}
+    for field in RANGE_FIELDS:
+        low, high = params.get(f'{field}_min'), params.get(f'{field}_max')
+        if low is None and high is None:
+            continue
+        try:
+            ranges[field] = (float(low) if low is not None else None, float(high) if high is not None else None)
+        except ValueError:
+            raise FilterError(f'{field}_min/{field}_max must be numbers.')
+
+    sort = params.get('sort') or None
+    if sort and sort.lstrip('-') not in SORT_FIELDS:
+        raise FilterError(f'Unknown sort: {sort}')
+    return selected, ranges, sort
+
+
+def sort_positions(index, positions, sort, rating_map):
+    """Urutkan posisi hasil filter. Default: urutan katalog (shoe_id)."""
+    if not sort:
+        return list(positions)
+    descending = sort.startswith('-')
+    field = SORT_FIELDS[sort.lstrip('-')]
+
+    def value(i):
+        shoe = index.shoes[i]
+        if field == 'rating':
+            return rating_map.get(shoe['shoe_id'], 0)
+        return shoe.get(field)
+
+    present = [i for i in positions if value(i) is not None]
+    missing = [i for i in positions if value(i) is None]  # yang gak punya data taruh di belakang
+    present.sort(key=value, reverse=descending)
+    return present + missing
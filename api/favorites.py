@@ -0,0 +1,161 @@
+"""
+Cache keanggotaan favorit per user pakai roaring bitmap.
+
+shoe_id (string) di-intern jadi angka kecil, lalu favorit tiap user disimpan sebagai
+BitMap di LRU terbatas. Cek "sepatu ini favorit gak?" untuk satu halaman hasil =
+intersection bitmap, tanpa query ke tabel favorites.
+
+Biar tetap konsisten antar worker, tiap entry nyimpen versi favorit user itu
+(api/versions.py). Tiap perubahan naikin versinya, dan SEMUA worker (termasuk yang
+ngubah) load ulang bitmap user itu sekali di pembacaan berikutnya. Bitmap sengaja
+gak di-patch di tempat: bump_version di file cache gak atomic, jadi dua perubahan
+barengan bisa dapat versi yang sama dan patch salah satunya bakal ketinggalan.
+"""
+import threading
+import uuid
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.db import connection, transaction
+from pyroaring import BitMap
+
+from . import versions
+from .models import Favorite
+
+_intern_ids = {}
+_intern_names = []
+_intern_lock = threading.Lock()
+
+_bitmaps = LRUCache(maxsize=settings.FAVORITES_CACHE_SIZE)
+_bitmaps_lock = threading.Lock()
+
+
+def version_name(user_id):
+    return f'favorites:{user_id}'
+
+
+def intern(shoe_id):
+    """
+    shoe_id -> angka (stabil selama proses hidup). Tabelnya gak pernah dikosongin,
+    jadi cuma dipanggil buat shoe_id dari tabel favorites (yang udah divalidasi view),
+    bukan input mentah dari client. Buat cek pakai lookup().
+    """
+    try:
+        return _intern_ids[shoe_id]
+    except KeyError:
+        pass
+    with _intern_lock:
+        if shoe_id not in _intern_ids:
+            _intern_ids[shoe_id] = len(_intern_names)
+            _intern_names.append(shoe_id)
+        return _intern_ids[shoe_id]
+
+
+def lookup(shoe_id):
+    """Angka intern shoe_id ini, atau None kalau belum pernah ada (gak nambahin entry)."""
+    return _intern_ids.get(shoe_id)
+
+
+def shoe_id_of(number):
+    return _intern_names[number]
+
+
+def _load(user_id):
+    shoe_ids = Favorite.objects.filter(user_id=user_id).values_list('shoe_id', flat=True)
+    return BitMap(intern(shoe_id) for shoe_id in shoe_ids)
+
+
+def get_bitmap(user_id):
+    """Bitmap favorit user (jangan diubah langsung, dipakai bareng request lain)."""
+    version = versions.get_version(version_name(user_id))
+    with _bitmaps_lock:
+        cached = _bitmaps.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    bitmap = _load(user_id)
+    with _bitmaps_lock:
+        _bitmaps[user_id] = (version, bitmap)
+    return bitmap
+
+
+def is_favorite(user_id, shoe_id):
+    bitmap = get_bitmap(user_id)  # load dulu: yang nge-intern favorit dari database
+    number = lookup(shoe_id)
+    return number is not None and number in bitmap
+
+
+def favorite_ids(user_id, shoe_ids=None):
+    """
+    Set shoe_id yang difavoritkan user. Kalau shoe_ids dikasih (misal satu halaman
+    hasil search), hasilnya cuma irisan dengan daftar itu.
+    """
+    bitmap = get_bitmap(user_id)
+    if shoe_ids is not None:
+        numbers = (lookup(shoe_id) for shoe_id in shoe_ids)
+        bitmap = bitmap & BitMap(number for number in numbers if number is not None)
+    return {shoe_id_of(number) for number in bitmap}
+
+
+def record_change(user_id):
+    """Dipanggil setelah tabel favorites berubah: naikin versi bersama + buang bitmap lokal."""
+    versions.bump_version(version_name(user_id))
+    with _bitmaps_lock:
+        _bitmaps.pop(user_id, None)
+
+
+# Toggle dalam SATU statement: hapus kalau ada, kalau gak ada baru insert.
+# Dua tap barengan gak bisa bikin IntegrityError karena insert-nya ON CONFLICT DO NOTHING.
+TOGGLE_SQL = """
+    WITH removed AS (
+        DELETE FROM favorites WHERE user_id = %s AND shoe_id = %s RETURNING id
+    ), added AS (
+        INSERT INTO favorites (id, user_id, shoe_id, created_at)
+        SELECT %s, %s, %s, now()
+        WHERE NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT (user_id, shoe_id) DO NOTHING
+        RETURNING id
+    )
+    SELECT NOT EXISTS (SELECT 1 FROM removed)
+"""
+
+
+def toggle(user_id, shoe_id):
+    """Balik status favorit. Return True kalau sekarang jadi favorit."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(TOGGLE_SQL, [user_id, shoe_id, uuid.uuid4(), user_id, shoe_id])
+            is_favorite = cursor.fetchone()[0]
+    else:
+        # Database lain (SQLite buat test) gak support DML di dalam CTE
+        with transaction.atomic():
+            deleted, _ = Favorite.objects.filter(user_id=user_id, shoe_id=shoe_id).delete()
+            is_favorite = not deleted
+            if is_favorite:
+                Favorite.objects.bulk_create([Favorite(user_id=user_id, shoe_id=shoe_id)], ignore_conflicts=True)
+
+    record_change(user_id)
+    return is_favorite
+
+
+def apply_changes(user_id, added=(), removed=()):
+    """
+    Set status favorit banyak sepatu sekaligus (idempotent): satu INSERT ... ON CONFLICT
+    DO NOTHING + satu DELETE, dalam satu transaksi.
+    """
+    added, removed = list(dict.fromkeys(added)), list(dict.fromkeys(removed))
+    with transaction.atomic():
+        if removed:
+            Favorite.objects.filter(user_id=user_id, shoe_id__in=removed).delete()
+        if added:
+            Favorite.objects.bulk_create(
+                [Favorite(user_id=user_id, shoe_id=shoe_id) for shoe_id in added],
+                ignore_conflicts=True,
+            )
+    if added or removed:
+        record_change(user_id)
+
+
+def clear_cache():
+    with _bitmaps_lock:
+        _bitmaps.clear()
@@ -0,0 +1,164 @@
+"""
+Antrian job sederhana di dalam proses (thread pool) buat kerjaan lambat yang gak
+perlu ditunggu user, misalnya panggilan Supabase Auth yang ngirim email.
+
+    job_id = jobs.enqueue('send_signup_otp', email, password, idempotency_key=email)
+    jobs.get_status(job_id)  # {'status': 'queued' | 'running' | 'succeeded' | 'failed', ...}
+
+- Retry pakai tenacity (exponential backoff) untuk error yang sifatnya sementara
+  (timeout, circuit breaker kebuka, 5xx dari Supabase). Error lain langsung gagal.
+- Idempotency key: enqueue dengan key + argumen yang sama selama
+  settings.JOB_IDEMPOTENCY_TTL detik balikin job_id yang sama, gak bikin job baru
+  (misal user klik dua kali). Key sama tapi argumennya beda -> IdempotencyConflict,
+  atau job baru kalau replace_on_conflict=True. Yang disimpan cuma hash argumennya.
+- Status job disimpan di cache Django alias 'state' (gak ikut ke-cull bareng cache
+  biasa), jadi bisa dicek dari worker mana aja.
+  Argumen job (password dll) TIDAK ikut disimpan, cuma ada di memori.
+
+Job hidup di proses yang nerima request. Kalau proses di-restart normal, job yang
+masih antri ditunggu sampai selesai; kalau proses dibunuh paksa, job-nya hilang.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.conf import settings
+from django.core.cache import cache, caches
+from supabase_auth.errors import AuthRetryableError
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+# Error yang layak dicoba lagi (view auth juga pakai ini buat balas 503)
+RETRYABLE = (httpx.TransportError, AuthRetryableError)
+
+
+class JobFailed(Exception):
+    """Gagal permanen, pesannya boleh ditampilkan ke user."""
+
+
+class IdempotencyConflict(Exception):
+    """Idempotency key yang sama udah dipakai buat job dengan argumen lain."""
+
+
+_tasks = {}
+_futures = {}
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def task(name):
+    """Daftarin fungsi sebagai job yang bisa di-enqueue pakai nama."""
+    def decorator(func):
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def _status_key(job_id):
+    return f'job:{job_id}'
+
+
+def _save(job):
+    caches['state'].set(_status_key(job['id']), dict(job), timeout=settings.JOB_STATUS_TTL)
+
+
+def get_status(job_id):
+    return caches['state'].get(_status_key(job_id))
+
+
+def _get_executor():
+    # Thread pool gak ikut ke proses hasil fork (gunicorn preload), bikin per proses
+    global _executor, _executor_pid
+    if _executor_pid != os.getpid():
+        with _lock:
+            if _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix='job')
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _fingerprint(task_name, args, kwargs):
+    payload = repr((task_name, args, sorted(kwargs.items())))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def enqueue(task_name, *args, idempotency_key=None, replace_on_conflict=False, **kwargs):
+    """Masukin job ke antrian, return job_id (langsung, gak nunggu job-nya jalan)."""
+    if task_name not in _tasks:
+        raise KeyError(f'Unknown job: {task_name}')
+
+    job_id = uuid.uuid4().hex
+    if idempotency_key:
+        idempotency_cache_key = f'job-idempotency:{task_name}:{idempotency_key}'
+        fingerprint = _fingerprint(task_name, args, kwargs)
+        entry = (job_id, fingerprint)
+        if not cache.add(idempotency_cache_key, entry, timeout=settings.JOB_IDEMPOTENCY_TTL):
+            existing = cache.get(idempotency_cache_key)
+            if existing and existing[1] == fingerprint:
+                return existing[0]
+            if existing and not replace_on_conflict:
+                raise IdempotencyConflict('This Idempotency-Key was already used for a different request.')
+            cache.set(idempotency_cache_key, entry, timeout=settings.JOB_IDEMPOTENCY_TTL)
+
+    job = {
+        'id': job_id,
+        'task': task_name,
+        'status': 'queued',
+        'attempts': 0,
+        'result': None,
+        'error': None,
+        'created_at': time.time(),
+        'finished_at': None,
+    }
+    _save(job)
+    future = _get_executor().submit(_run, job, args, kwargs)
+    with _lock:
+        _futures[job_id] = future
+    future.add_done_callback(lambda _: _futures.pop(job_id, None))
+    return job_id
+
+
+def _run(job, args, kwargs):
+    job['status'] = 'running'
+    _save(job)
+
+    def attempt():
+        job['attempts'] += 1
+        return _tasks[job['task']](*args, **kwargs)
+
+    retrying = Retrying(
+        stop=stop_after_attempt(settings.JOB_MAX_ATTEMPTS),
+        wait=wait_exponential(multiplier=settings.JOB_RETRY_BACKOFF, max=settings.JOB_RETRY_BACKOFF_MAX),
+        retry=retry_if_exception_type(RETRYABLE),
+        before_sleep=lambda _: _save(job),  # biar jumlah attempt kelihatan waktu lagi nunggu retry
+        reraise=True,
+    )
+    try:
+        job['result'] = retrying(attempt)
+        job['status'] = 'succeeded'
+    except JobFailed as e:
+        job['status'], job['error'] = 'failed', str(e)
+    except RETRYABLE:
+        logger.warning('Job %s (%s) gave up after %s attempts', job['id'], job['task'], job['attempts'])
+        job['status'], job['error'] = 'failed', 'Service is temporarily unavailable. Please try again later.'
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job['id'], job['task'])
+        job['status'], job['error'] = 'failed', str(e)
+    job['finished_at'] = time.time()
+    _save(job)
+
+
+def wait(job_id, timeout=None):
+    """Tunggu job selesai (kalau jalannya di proses ini), lalu return statusnya."""
+    with _lock:
+        future = _futures.get(job_id)
+    if future is not None:
+        future.result(timeout=timeout)
+    return get_status(job_id)
@@ -0,0 +1,82 @@
+"""
+Update kolom last_login secara batch di background (write-behind).
+
+Login cuma nyatet (user_id, waktu) ke buffer di memori. Thread background nulis
+isi buffer tiap settings.LAST_LOGIN_FLUSH_INTERVAL detik dalam SATU bulk UPDATE,
+jadi request login gak nunggu UPDATE ke database, dan user yang login berkali-kali
+dalam satu interval cuma ditulis sekali (waktu paling baru).
+
+Kalau proses mati mendadak, last_login yang belum ke-flush bisa hilang (paling
+lama satu interval). Itu cuma info "terakhir login", bukan data penting.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+_pending = {}
+_lock = threading.Lock()
+_worker_pid = None
+
+
+def record(user_id, when=None):
+    if settings.LAST_LOGIN_FLUSH_INTERVAL <= 0:
+        User.objects.filter(id=user_id).update(last_login=when or timezone.now())
+        return
+    with _lock:
+        _pending[user_id] = when or timezone.now()
+    _ensure_worker()
+
+
+def flush():
+    """Tulis semua yang ada di buffer (satu query). Return jumlah user yang di-update."""
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+    User.objects.bulk_update(
+        [User(id=user_id, last_login=when) for user_id, when in pending.items()],
+        ['last_login'],
+    )
+    return len(pending)
+
+
+def _run():
+    while True:
+        time.sleep(settings.LAST_LOGIN_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Failed to flush last_login updates')
+        finally:
+            close_old_connections()
+
+
+def _ensure_worker():
+    # Cek pid: thread gak ikut ke proses hasil fork (gunicorn preload), jadi tiap
+    # worker bikin thread-nya sendiri
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    with _lock:
+        if _worker_pid != os.getpid():
+            threading.Thread(target=_run, name='last-login-writer', daemon=True).start()
+            _worker_pid = os.getpid()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        pass
@@ -0,0 +1,68 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark HTTP ke server yang lagi jalan (runserver vs gunicorn vs uvicorn). '
+        'Tiap thread pakai satu koneksi keep-alive, kayak browser/load balancer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', required=True, help='Bisa diulang buat bandingin beberapa server')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--token', help='Token auth (header "Authorization: Token ...")')
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Token {options['token']}"} if options['token'] else {}
+        self.stdout.write(f"{'url':<50} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for url in options['url']:
+            rps, samples, errors = self._run(url, options['requests'], options['concurrency'], headers)
+            if not samples:
+                self.stdout.write(f'{url:<50} semua request gagal ({errors})')
+                continue
+            samples.sort()
+            self.stdout.write(
+                f'{url:<50} {rps:>8.0f} {statistics.median(samples):>8.2f} '
+                f'{_percentile(samples, 0.95):>8.2f} {_percentile(samples, 0.99):>8.2f} {errors:>7}'
+            )
+
+    def _run(self, url, total, concurrency, headers):
+        parts = urlsplit(url)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        local = threading.local()
+
+        def one_request(_):
+            if not hasattr(local, 'conn'):
+                local.conn = connection_class(parts.netloc, timeout=30)
+            started = time.perf_counter()
+            try:
+                local.conn.request('GET', path, headers=headers)
+                response = local.conn.getresponse()
+                response.read()
+                ok = response.status < 500
+            except (OSError, http.client.HTTPException):
+                local.conn.close()
+                del local.conn
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one_request, range(total)))
+        elapsed = time.perf_counter() - started
+
+        samples = [ms for ok, ms in results if ok]
+        return len(samples) / elapsed, samples, len(results) - len(samples)
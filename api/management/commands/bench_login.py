@@ -0,0 +1,102 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api import last_login, views
+from api.models import User
+
+USER_PREFIX = 'bench-login-'
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def legacy_login(request):
+    """Alur login lama (sebelum fast path), disimpan di sini cuma buat pembanding."""
+    input_ident = request.data.get('username')
+    password = request.data.get('password')
+    username_to_auth = input_ident
+    if '@' in input_ident:
+        try:
+            username_to_auth = User.objects.get(email=input_ident).username
+        except User.DoesNotExist:
+            pass
+    user = authenticate(username=username_to_auth, password=password)
+    if user is None:
+        return Response({'error': 'Username/Email atau Password salah.'}, status=401)
+    update_last_login(None, user)
+    token, _ = Token.objects.get_or_create(user=user)
+    return Response({'token': token.key, 'has_profile': hasattr(user, 'profile')}, status=200)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark latency login (alur lama vs fast path) dengan request paralel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--real-hasher', action='store_true',
+            help='Pakai hasher password asli. Default pakai MD5 biar yang keukur overhead query, bukan hashing.',
+        )
+
+    def handle(self, *args, **options):
+        hashers = None if options['real_hasher'] else ['django.contrib.auth.hashers.MD5PasswordHasher']
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            users = self._create_users(options['users'])
+            try:
+                self.stdout.write(f"{'path':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+                for name, view in (('before', legacy_login), ('after', views.login_user)):
+                    self._bench(name, view, users, options['requests'], options['concurrency'])
+                    last_login.flush()
+            finally:
+                User.objects.filter(username__startswith=USER_PREFIX).delete()
+
+    def _create_users(self, count):
+        User.objects.filter(username__startswith=USER_PREFIX).delete()
+        users = []
+        for i in range(count):
+            user = User(username=f'{USER_PREFIX}{i}', email=f'{USER_PREFIX}{i}@example.com')
+            user.set_password('bench-password')
+            users.append(user)
+        User.objects.bulk_create(users)
+        # Separuh login pakai email, separuh pakai username
+        return [user.email if i % 2 else user.username for i, user in enumerate(users)]
+
+    def _bench(self, name, view, identifiers, total, concurrency):
+        factory = APIRequestFactory()
+
+        def one_login(i):
+            request = factory.post('/api/login/', {'username': identifiers[i % len(identifiers)], 'password': 'bench-password'}, format='json')
+            started = time.perf_counter()
+            try:
+                ok = view(request).status_code == 200
+            except Exception:
+                ok = False
+            finally:
+                close_old_connections()
+            return ok, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one_login, range(total)))
+        elapsed = time.perf_counter() - started
+
+        samples = sorted(ms for ok, ms in results if ok)
+        errors = len(results) - len(samples)
+        if not samples:
+            self.stdout.write(f'{name:<10} semua login gagal ({errors})')
+            return
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        self.stdout.write(f'{name:<10} {len(samples) / elapsed:>8.0f} {statistics.median(samples):>8.2f} {p99:>8.2f} {errors:>7}')
@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api import catalog, shoe_payloads
+from api.catalog import CatalogSnapshot
+from api.models import Shoe
+from api.serializers import ShoeSerializer
+
+
+def fake_catalog(size, seed=0):
+    """Katalog sintetis yang semua kolom tabel shoes-nya terisi."""
+    rng = random.Random(seed)
+    shoes = []
+    for i in range(size):
+        shoe = {}
+        for field in Shoe._meta.concrete_fields:
+            if field.get_internal_type() == 'FloatField':
+                shoe[field.attname] = round(rng.uniform(0, 12), 1)
+            elif field.get_internal_type() == 'IntegerField':
+                shoe[field.attname] = rng.randint(0, 5)
+            else:
+                shoe[field.attname] = f'{field.attname}-{i}'
+        shoe.update(shoe_id=f'B{i:06d}', slug=f'bench-{i}', img_url=f'https://example.com/{i}.jpg')
+        shoes.append(shoe)
+    return shoes
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark render payload detail sepatu: ShoeSerializer per request vs bytes yang di-cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shoes', type=int, default=500, help='Ukuran katalog sintetis')
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--real-catalog', action='store_true', help='Pakai katalog dari database')
+
+    def handle(self, *args, **options):
+        if options['real_catalog']:
+            snapshot = catalog.get_snapshot()
+        else:
+            snapshot = CatalogSnapshot(fake_catalog(options['shoes']))
+        if not len(snapshot):
+            self.stdout.write('Katalog kosong.')
+            return
+
+        renderer = JSONRenderer()
+        dynamic = {'isFavorite': True, 'rating': 4.3, 'reviews': [], 'reviews_next_cursor': None}
+        rng = random.Random(1)
+        picks = [rng.choice(snapshot.shoes) for _ in range(options['requests'])]
+
+        def serializer_path(shoe):
+            data = dict(ShoeSerializer(shoe).data)
+            data['mainImage'] = shoe.get('img_url')
+            data['model'] = shoe.get('name')
+            data.update(dynamic)
+            return renderer.render(data)
+
+        def cached_path(shoe):
+            return shoe_payloads.render(snapshot, shoe, dynamic)
+
+        started = time.perf_counter()
+        shoe_payloads.render_all(snapshot)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(f"{'path':<12} {'p50 us':>8} {'p99 us':>8} {'req/s':>10}")
+        results = {}
+        for name, func in (('serializer', serializer_path), ('cached', cached_path)):
+            samples = []
+            for shoe in picks:
+                started = time.perf_counter()
+                func(shoe)
+                samples.append((time.perf_counter() - started) * 1_000_000)
+            p50, p99 = percentiles(samples)
+            results[name] = p50
+            self.stdout.write(f'{name:<12} {p50:>8.1f} {p99:>8.1f} {1_000_000 * len(samples) / sum(samples):>10.0f}')
+
+        self.stdout.write(
+            f'{len(snapshot)} sepatu di-render awal dalam {build_ms:.1f} ms, '
+            f"cached {results['serializer'] / results['cached']:.1f}x lebih cepat (p50)."
+        )
@@ -0,0 +1,49 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import recommend
+from api.catalog import CatalogSnapshot
+from api.models import UserProfile
+
+
+def fake_catalog(size, seed=0):
+    """Katalog sintetis dengan kolom fitur random (sebagian kosong, kayak data asli)."""
+    rng = random.Random(seed)
+    shoes = []
+    for i in range(size):
+        shoe = {'shoe_id': f'B{i:06d}', 'name': f'Bench Shoe {i}', 'brand': 'Bench', 'slug': f'bench-{i}'}
+        for name in recommend.FEATURES:
+            shoe[name] = None if rng.random() < 0.05 else rng.randint(0, 5)
+        shoes.append(shoe)
+    return shoes
+
+
+class Command(BaseCommand):
+    help = 'Benchmark latency rekomendasi (skoring vectorized) untuk berbagai ukuran katalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, **options):
+        profile = UserProfile(foot_width='Wide', arch_type='Flat', uses_orthotics=True)
+        self.stdout.write(f"{'shoes':>8} {'build ms':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+        for size in options['sizes']:
+            snapshot = CatalogSnapshot(fake_catalog(size))
+            started = time.perf_counter()
+            recommend.get_matrix(snapshot)  # dibangun sekali per snapshot, bukan per request
+            build_ms = (time.perf_counter() - started) * 1000
+
+            samples = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                recommend.recommend(snapshot, profile, limit=options['limit'])
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            self.stdout.write(f'{size:>8} {build_ms:>10.1f} {statistics.median(samples):>8.3f} {p99:>8.3f}')
@@ -0,0 +1,53 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api import compression
+from api.management.commands.bench_payloads import fake_catalog
+from api.renderers import ORJSONRenderer
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return result, statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark render JSON (stdlib vs orjson) + ukuran & biaya kompresi payload katalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[60, 1000], help='Jumlah sepatu per response')
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        for size in options['sizes']:
+            shoes = [dict(shoe, rating=4.2) for shoe in fake_catalog(size)]
+            self.stdout.write(f'\n{size} sepatu')
+            self.stdout.write(f"  {'step':<22} {'bytes':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+            content = None
+            for name, renderer in (('render stdlib json', JSONRenderer()), ('render orjson', ORJSONRenderer())):
+                content, p50, p99 = timed(lambda: renderer.render(shoes), repeat)
+                self.stdout.write(f'  {name:<22} {len(content):>10} {p50:>8.3f} {p99:>8.3f}')
+
+            for encoding in compression.ENCODINGS:
+                body, p50, p99 = timed(lambda: compression.compress(content, encoding), repeat)
+                self.stdout.write(f'  {encoding + " per request":<22} {len(body):>10} {p50:>8.3f} {p99:>8.3f}')
+
+                compression.clear_cache()
+                started = time.perf_counter()
+                compression.get_variant(content, encoding, 'W/"bench"')
+                first_ms = (time.perf_counter() - started) * 1000
+                body, p50, p99 = timed(lambda: compression.get_variant(content, encoding, 'W/"bench"'), repeat)
+                self.stdout.write(
+                    f'  {encoding + " precompressed":<22} {len(body):>10} {p50:>8.3f} {p99:>8.3f}'
+                    f'   (kompres pertama {first_ms:.1f} ms)'
+                )
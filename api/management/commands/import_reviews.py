@@ -0,0 +1,79 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import catalog, review_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        'Import review dari file CSV / JSONL (kolom: user_id, shoe_id, rating, text). '
+        'File dibaca baris per baris dan ditulis per batch, jadi memori tetap kecil.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path file, atau '-' buat stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: ditebak dari ekstensi file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--allow-duplicates', action='store_true',
+            help='Tetap insert walaupun user udah pernah review sepatu yang sama',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Cuma validasi, gak nulis apa-apa')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['path'].lower().endswith('.csv') else 'jsonl')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        known_shoe_ids = catalog.get_snapshot().by_id
+
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        counts = {'read': 0, 'invalid': 0, 'written': 0}
+        batch = []
+        try:
+            for line_no, row in self._rows(stream, fmt):
+                counts['read'] += 1
+                try:
+                    batch.append(review_buffer.validate(
+                        row.get('user_id'), row.get('shoe_id'), row.get('rating'),
+                        row.get('text', row.get('review_text')), known_shoe_ids=known_shoe_ids,
+                    ))
+                except review_buffer.ReviewError as e:
+                    counts['invalid'] += 1
+                    self.stderr.write(f'line {line_no}: {e}')
+                if len(batch) >= options['batch_size']:
+                    counts['written'] += self._write(batch, options)
+                    batch = []
+            counts['written'] += self._write(batch, options)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        skipped = counts['read'] - counts['invalid'] - counts['written']
+        verb = 'valid' if options['dry_run'] else 'ditulis'
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['read']} baris dibaca, {counts['written']} {verb}, "
+            f"{counts['invalid']} tidak valid, {skipped} duplikat dilewati."
+        ))
+
+    def _rows(self, stream, fmt):
+        if fmt == 'csv':
+            # Baris 1 = header
+            for line_no, row in enumerate(csv.DictReader(stream), start=2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else {}
+
+    def _write(self, batch, options):
+        if options['dry_run']:
+            return len({(review['user_id'], review['shoe_id']) for review in batch})
+        return review_buffer.write_batch(batch, skip_existing=not options['allow_duplicates'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import catalog
+
+
+class Command(BaseCommand):
+    help = 'Paksa semua worker download ulang katalog sepatu di request berikutnya.'
+
+    def handle(self, *args, **options):
+        catalog.invalidate()
+        self.stdout.write(self.style.SUCCESS('Cache katalog sepatu sudah di-invalidate.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import ratings
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang tabel ShoeRatingSummary dari tabel reviews (full rebuild).'
+
+    def handle(self, *args, **options):
+        total = ratings.rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Rating summary dibangun ulang untuk {total} sepatu.'))
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_favorite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoeRatingSummary',
+            fields=[
+                ('shoe_id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('star_1', models.IntegerField(default=0)),
+                ('star_2', models.IntegerField(default=0)),
+                ('star_3', models.IntegerField(default=0)),
+                ('star_4', models.IntegerField(default=0)),
+                ('star_5', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'shoe_rating_summary',
+            },
+        ),
+    ]
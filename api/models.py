@@ -154,4 +154,37 @@ class Favorite(models.Model):
         unique_together = ('user', 'shoe_id')
 
     def __str__(self):
-        return f"User {self.user.username} favorited {self.shoe_id}"
\ No newline at end of file
+        return f"User {self.user.username} favorited {self.shoe_id}"
+
+
+# --- 6. Rating Summary (Materialized, di-update tiap ada review baru) ---
+class ShoeRatingSummary(models.Model):
+    # Satu baris per sepatu, biar halaman katalog gak perlu narik semua review
+    shoe_id = models.CharField(max_length=50, primary_key=True)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+
+    # Histogram bintang 1-5
+    star_1 = models.IntegerField(default=0)
+    star_2 = models.IntegerField(default=0)
+    star_3 = models.IntegerField(default=0)
+    star_4 = models.IntegerField(default=0)
+    star_5 = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'shoe_rating_summary'
+
+    @property
+    def average(self):
+        if not self.review_count:
+            return 0
+        return round(self.rating_sum / self.review_count, 1)
+
+    @property
+    def histogram(self):
+        return {str(star): getattr(self, f'star_{star}') for star in range(1, 6)}
+
+    def __str__(self):
+        return f"Rating {self.shoe_id}: {self.average} ({self.review_count} review)"
@@ -0,0 +1,69 @@
+"""
+Keyset (cursor) pagination + projection field untuk list katalog.
+
+Cursor = shoe_id terakhir di halaman sebelumnya (di-encode base64 biar opaque),
+jadi ambil halaman ke-N tetap O(log n) lewat bisect, gak kayak OFFSET yang makin
+jauh makin lambat.
+"""
+import base64
+import binascii
+from bisect import bisect_right
+
+DEFAULT_PAGE_SIZE = 60
+MAX_PAGE_SIZE = 200
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return base64.b64decode(padded.encode(), altchars=b'-_', validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError('Invalid cursor.')
+
+
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if raw in (None, ''):
+        return default
+    try:
+        return min(max(int(raw), 1), maximum)
+    except ValueError:
+        raise PaginationError('limit must be a number.')
+
+
+def parse_fields(raw, allowed):
+    """'name,brand' -> ['name', 'brand']. None kalau gak ada projection (semua kolom)."""
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _ordered(snapshot):
+    rows = sorted(snapshot.shoes, key=lambda shoe: shoe['shoe_id'])
+    return [shoe['shoe_id'] for shoe in rows], rows
+
+
+def page_after(snapshot, cursor, limit):
+    """Ambil `limit` sepatu setelah cursor (urut shoe_id). Return (baris, cursor berikutnya)."""
+    keys, rows = snapshot.derived('ordered_by_shoe_id', _ordered)
+    start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+    page = rows[start:start + limit]
+    next_cursor = encode_cursor(page[-1]['shoe_id']) if start + limit < len(rows) else None
+    return page, next_cursor
+
+
+def project(row, fields):
+    if fields is None:
+        return row
+    return {field: row.get(field) for field in fields}
@@ -0,0 +1,130 @@
+"""
+Service agregasi rating sepatu.
+
+Semua view yang butuh rata-rata rating (search, detail, list, favorites) lewat sini,
+biar cara hitungnya sama dan jumlah query per request tetap, berapapun jumlah
+sepatu yang lagi diproses.
+
+Sumber datanya tabel ShoeRatingSummary (1 baris per sepatu), bukan tabel reviews
+mentah. Summary di-update tiap add_review dan bisa dibangun ulang pakai:
+    python manage.py rebuild_rating_summary
+"""
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import versions
+from .models import Review, ShoeRatingSummary
+
+STARS = range(1, 6)
+VERSION_NAME = 'ratings'
+
+
+def get_summaries(shoe_ids=None):
+    """
+    Ambil ShoeRatingSummary untuk banyak sepatu sekaligus -> map shoe_id -> summary.
+
+    Budget query: maksimal SATU query.
+    - shoe_ids=None  -> summary semua sepatu (dipakai get_all_shoes)
+    - shoe_ids=[...] -> cuma sepatu yang diminta (satu query IN)
+    - shoe_ids=[]    -> gak ada query sama sekali
+    """
+    if shoe_ids is not None:
+        shoe_ids = list(dict.fromkeys(shoe_ids))
+        if not shoe_ids:
+            return {}
+
+    qs = ShoeRatingSummary.objects.all()
+    if shoe_ids is not None:
+        qs = qs.filter(shoe_id__in=shoe_ids)
+    return {summary.shoe_id: summary for summary in qs}
+
+
+def get_rating_map(shoe_ids=None):
+    """
+    Rata-rata rating banyak sepatu (satu query, lihat get_summaries).
+    Sepatu tanpa review tidak ada di map, pakai .get(s_id, 0) di pemanggil.
+    """
+    return {s_id: summary.average for s_id, summary in get_summaries(shoe_ids).items()}
+
+
+def get_rating(shoe_id):
+    """Rating satu sepatu (satu query)."""
+    return get_rating_map([shoe_id]).get(shoe_id, 0)
+
+
+def record_review(shoe_id, rating):
+    """
+    Update summary secara incremental waktu ada review baru masuk.
+    Pakai F() biar aman kalau ada dua review masuk barengan (atomic di level DB).
+    """
+    changes = {
+        'review_count': F('review_count') + 1,
+        'rating_sum': F('rating_sum') + rating,
+    }
+    if rating in STARS:
+        changes[f'star_{rating}'] = F(f'star_{rating}') + 1
+
+    with transaction.atomic():
+        ShoeRatingSummary.objects.get_or_create(shoe_id=shoe_id)
+        ShoeRatingSummary.objects.filter(shoe_id=shoe_id).update(**changes)
+        transaction.on_commit(bump_version)
+
+
+def record_reviews(rows):
+    """
+    Versi batch record_review buat banyak review sekaligus ((shoe_id, rating), ...).
+    Berapapun jumlah sepatunya cuma 3 query + satu kali bump versi.
+    """
+    deltas = {}
+    for shoe_id, rating in rows:
+        delta = deltas.setdefault(shoe_id, {'review_count': 0, 'rating_sum': 0})
+        delta['review_count'] += 1
+        delta['rating_sum'] += rating
+        if rating in STARS:
+            delta[f'star_{rating}'] = delta.get(f'star_{rating}', 0) + 1
+    if not deltas:
+        return 0
+
+    fields = ['review_count', 'rating_sum'] + [f'star_{star}' for star in STARS] + ['updated_at']
+    now = timezone.now()
+    with transaction.atomic():
+        ShoeRatingSummary.objects.bulk_create(
+            [ShoeRatingSummary(shoe_id=shoe_id) for shoe_id in deltas], ignore_conflicts=True,
+        )
+        # Dikunci dulu biar gak balapan sama record_review / batch lain di worker lain
+        summaries = list(ShoeRatingSummary.objects.select_for_update().filter(shoe_id__in=list(deltas)))
+        for summary in summaries:
+            for field, amount in deltas[summary.shoe_id].items():
+                setattr(summary, field, getattr(summary, field) + amount)
+            summary.updated_at = now
+        ShoeRatingSummary.objects.bulk_update(summaries, fields)
+        transaction.on_commit(bump_version)
+    return len(summaries)
+
+
+def rebuild_summaries():
+    """
+    Hitung ulang semua summary dari tabel reviews (full rebuild).
+    Return jumlah sepatu yang punya summary.
+    """
+    summaries = {}
+    rows = Review.objects.values('shoe_id', 'rating').annotate(n=Count('id')).order_by()
+    for row in rows:
+        summary = summaries.setdefault(row['shoe_id'], ShoeRatingSummary(shoe_id=row['shoe_id']))
+        summary.review_count += row['n']
+        summary.rating_sum += row['rating'] * row['n']
+        if row['rating'] in STARS:
+            star_field = f"star_{row['rating']}"
+            setattr(summary, star_field, getattr(summary, star_field) + row['n'])
+
+    with transaction.atomic():
+        ShoeRatingSummary.objects.all().delete()
+        ShoeRatingSummary.objects.bulk_create(summaries.values(), batch_size=500)
+        transaction.on_commit(bump_version)
+    return len(summaries)
+
+
+def bump_version():
+    """Rating berubah -> ETag katalog lama gak berlaku lagi (lihat api/conditional.py)."""
+    versions.bump_version(VERSION_NAME)
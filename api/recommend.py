@@ -0,0 +1,131 @@
+"""
+Rekomendasi sepatu berdasarkan UserProfile (foot_width, arch_type, uses_orthotics).
+
+Semua kolom fitur numerik/boolean di tabel shoes dijadikan satu matrix NumPy
+(dinormalisasi ke 0..1) sekali per snapshot katalog. Tiap request cuma bikin
+vektor target + bobot dari profile, lalu skor seluruh katalog dihitung dalam satu
+operasi vektor, tanpa loop Python per sepatu.
+"""
+import warnings
+
+import numpy as np
+
+# Kolom di model Shoe yang dipakai sebagai fitur
+FEATURES = (
+    'weight_lab_oz', 'drop_lab_mm', 'heel_lab_mm', 'forefoot_lab_mm', 'lug_dept_mm',
+    'lightweight', 'rocker', 'removable_insole', 'waterproof', 'water_repellent',
+    'pace_daily_running', 'pace_tempo', 'pace_competition',
+    'terrain_light', 'terrain_moderate', 'terrain_technical',
+    'arch_neutral', 'arch_stability',
+    'plate_rock_plate', 'plate_carbon_plate',
+    'stiffness_scaled', 'torsional_rigidity', 'heel_stiff', 'midsole_softness',
+    'shock_absorption', 'energy_return', 'traction_scaled',
+    'toebox_durability', 'heel_durability', 'outsole_durability', 'breathability_scaled',
+    'width_fit', 'toebox_width',
+    'season_summer', 'season_winter', 'season_all',
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+# Target (0..1, setelah normalisasi) + bobot per kolom untuk tiap pilihan profile.
+# Kolom yang gak disebut gak ikut dihitung.
+FOOT_WIDTH_TARGETS = {
+    'Narrow': {'width_fit': (0.2, 2.0), 'toebox_width': (0.2, 2.0)},
+    'Regular': {'width_fit': (0.5, 1.0), 'toebox_width': (0.5, 1.0)},
+    'Wide': {'width_fit': (0.9, 2.0), 'toebox_width': (0.9, 2.0)},
+}
+ARCH_TYPE_TARGETS = {
+    'Flat': {
+        'arch_stability': (1.0, 2.5), 'arch_neutral': (0.0, 1.0),
+        'torsional_rigidity': (0.8, 1.0), 'heel_stiff': (0.8, 1.0), 'midsole_softness': (0.4, 0.5),
+    },
+    'Normal': {
+        'arch_neutral': (1.0, 1.5), 'arch_stability': (0.0, 0.5),
+        'midsole_softness': (0.5, 0.5), 'shock_absorption': (0.6, 0.5),
+    },
+    'High': {
+        'arch_neutral': (1.0, 1.5), 'arch_stability': (0.0, 1.0),
+        'midsole_softness': (0.8, 1.0), 'shock_absorption': (0.9, 1.5), 'stiffness_scaled': (0.3, 0.5),
+    },
+}
+ORTHOTICS_TARGETS = {'removable_insole': (1.0, 2.0), 'toebox_width': (0.7, 0.5)}
+
+
+class FeatureMatrix:
+    """Matrix fitur (disimpan transpose: baris = fitur, kolom = sepatu) dari satu snapshot."""
+
+    def __init__(self, snapshot):
+        self.shoes = snapshot.shoes
+        raw = np.array(
+            [[_as_float(shoe.get(name)) for name in FEATURES] for shoe in self.shoes],
+            dtype=np.float64,
+        ).reshape(len(self.shoes), len(FEATURES))
+        self.values = np.ascontiguousarray(normalize_columns(raw).T, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.shoes)
+
+
+def _as_float(value):
+    return np.nan if value is None else float(value)
+
+
+def normalize_columns(raw):
+    """Min-max per kolom ke 0..1. Nilai kosong diisi rata-rata kolomnya (atau 0.5)."""
+    if raw.size == 0:
+        return raw
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # kolom yang kosong semua
+        low = np.nanmin(raw, axis=0)
+        high = np.nanmax(raw, axis=0)
+        mean = np.nanmean(raw, axis=0)
+    low = np.nan_to_num(low)
+    span = np.nan_to_num(high) - low
+    span[span == 0] = 1.0
+    fill = np.nan_to_num((mean - low) / span, nan=0.5)
+    scaled = (raw - low) / span
+    return np.where(np.isnan(scaled), fill, scaled)
+
+
+def profile_targets(profile):
+    """Gabungkan target dari semua atribut profile -> (index kolom, target, bobot)."""
+    targets = {}
+    for table, key in (
+        (FOOT_WIDTH_TARGETS, profile.foot_width),
+        (ARCH_TYPE_TARGETS, profile.arch_type),
+    ):
+        targets.update(table.get(key, {}))
+    if profile.uses_orthotics:
+        targets.update(ORTHOTICS_TARGETS)
+
+    columns = np.array([FEATURE_INDEX[name] for name in targets], dtype=np.intp)
+    target = np.array([t for t, _ in targets.values()], dtype=np.float32)
+    weight = np.array([w for _, w in targets.values()], dtype=np.float32)
+    return columns, target, weight
+
+
+def score(matrix, columns, target, weight):
+    """Skor 0..1 untuk semua sepatu sekaligus (1 = paling cocok)."""
+    if not len(columns):
+        return np.ones(matrix.values.shape[1], dtype=np.float32)
+    distance = weight @ np.abs(matrix.values[columns] - target[:, None])
+    return 1.0 - distance / weight.sum()
+
+
+def top_n(scores, n):
+    """Index N skor tertinggi, urut menurun. argpartition biar gak sort semua."""
+    n = min(n, len(scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    best = np.argpartition(-scores, n - 1)[:n]
+    return best[np.argsort(-scores[best], kind='stable')]
+
+
+def get_matrix(snapshot):
+    return snapshot.derived('features', FeatureMatrix)
+
+
+def recommend(snapshot, profile, limit=10):
+    """Return list (baris sepatu, skor) untuk profile ini."""
+    matrix = get_matrix(snapshot)
+    scores = score(matrix, *profile_targets(profile))
+    return [(matrix.shoes[i], float(scores[i])) for i in top_n(scores, limit)]
@@ -0,0 +1,169 @@
+"""
+Simpan review secara batch (write-behind), buat kampanye review & import massal.
+
+    review = review_buffer.validate(user_id, shoe_id, rating, text)
+    review_buffer.submit(review)   # True = masuk buffer, False = langsung ditulis
+
+Kalau settings.REVIEW_FLUSH_INTERVAL > 0, review ditampung di memori lalu thread
+background nulis semuanya tiap interval itu, atau lebih cepat kalau buffer udah
+settings.REVIEW_BATCH_SIZE review. Satu batch = satu bulk INSERT ke reviews +
+satu update summary rating (ratings.record_reviews), bukan satu-satu per review.
+
+Dalam buffer, review dari user yang sama untuk sepatu yang sama cuma disimpan
+yang terakhir (double submit gak jadi dua review). Kalau proses mati mendadak,
+review yang belum ke-flush hilang, jadi defaultnya interval 0 (langsung tulis).
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from . import ratings
+from .models import Review
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 5000
+# Kalau database lagi gak bisa ditulis, buffer gak boleh numbuh tanpa batas
+MAX_BUFFERED_BATCHES = 10
+
+
+class ReviewError(ValueError):
+    pass
+
+
+def validate(user_id, shoe_id, rating, text, known_shoe_ids=None):
+    """Cek & rapikan satu review. Raise ReviewError kalau gak valid."""
+    shoe_id = str(shoe_id or '').strip()
+    text = str(text or '').strip()
+    if not user_id or not shoe_id or not text:
+        raise ReviewError('Data review tidak lengkap.')
+    try:
+        rating = int(rating)
+    except (TypeError, ValueError):
+        rating = None
+    if rating not in ratings.STARS:
+        raise ReviewError('Rating harus angka 1 sampai 5.')
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ReviewError(f'Review text is too long (max {MAX_TEXT_LENGTH} characters).')
+    if known_shoe_ids is not None and shoe_id not in known_shoe_ids:
+        raise ReviewError(f'Sepatu {shoe_id} tidak ditemukan.')
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        raise ReviewError('Invalid user_id.')
+    return {'user_id': user_id, 'shoe_id': shoe_id, 'rating': rating, 'review_text': text}
+
+
+def _key(review):
+    return review['user_id'], review['shoe_id']
+
+
+def write_batch(reviews, skip_existing=False):
+    """
+    Tulis banyak review (hasil validate) dalam satu transaksi. Duplikat (user, sepatu)
+    di dalam batch diambil yang terakhir; skip_existing=True juga ngelewatin pasangan
+    yang udah ada di tabel (dipakai import biar bisa dijalankan ulang).
+    Return jumlah review yang beneran ditulis.
+    """
+    unique = {_key(review): review for review in reviews}
+    if not unique:
+        return 0
+
+    with transaction.atomic():
+        if skip_existing:
+            existing = set(
+                Review.objects.filter(
+                    user_id__in={user_id for user_id, _ in unique},
+                    shoe_id__in={shoe_id for _, shoe_id in unique},
+                ).values_list('user_id', 'shoe_id')
+            )
+            unique = {key: review for key, review in unique.items() if key not in existing}
+            if not unique:
+                return 0
+        Review.objects.bulk_create([Review(**review) for review in unique.values()], batch_size=500)
+        ratings.record_reviews((review['shoe_id'], review['rating']) for review in unique.values())
+    return len(unique)
+
+
+_pending = {}
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker_pid = None
+
+
+def submit(review):
+    """Simpan review hasil validate. Return True kalau masuk buffer, False kalau langsung ditulis."""
+    if settings.REVIEW_FLUSH_INTERVAL <= 0:
+        write_batch([review])
+        return False
+
+    with _lock:
+        _pending[_key(review)] = review
+        size = len(_pending)
+    if size >= settings.REVIEW_BATCH_SIZE * MAX_BUFFERED_BATCHES:
+        flush()  # thread background ketinggalan, request ini ikut nulis (backpressure)
+    elif size >= settings.REVIEW_BATCH_SIZE:
+        _wakeup.set()
+    _ensure_worker()
+    return True
+
+
+def pending_count():
+    with _lock:
+        return len(_pending)
+
+
+def flush():
+    """Tulis semua isi buffer per batch. Return jumlah review yang ditulis."""
+    with _lock:
+        pending = list(_pending.values())
+        _pending.clear()
+
+    written = 0
+    batch_size = settings.REVIEW_BATCH_SIZE
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        try:
+            written += write_batch(batch)
+        except Exception:
+            # Balikin yang belum ketulis, tapi jangan nimpa review yang lebih baru
+            with _lock:
+                for review in pending[start:]:
+                    _pending.setdefault(_key(review), review)
+            raise
+    return written
+
+
+def _run():
+    while True:
+        _wakeup.wait(settings.REVIEW_FLUSH_INTERVAL)
+        _wakeup.clear()
+        try:
+            flush()
+        except Exception:
+            logger.exception('Failed to flush buffered reviews')
+        finally:
+            close_old_connections()
+
+
+def _ensure_worker():
+    # Sama kayak last_login: thread gak ikut ke proses hasil fork, bikin per worker
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    with _lock:
+        if _worker_pid != os.getpid():
+            threading.Thread(target=_run, name='review-writer', daemon=True).start()
+            _worker_pid = os.getpid()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception('Failed to flush buffered reviews on exit')
@@ -0,0 +1,89 @@
+"""
+Listing review per sepatu: halaman pakai keyset cursor + export NDJSON streaming.
+
+Urutan review: terbaru dulu (created_at DESC, id DESC). Cursor = posisi review
+terakhir di halaman sebelumnya, jadi halaman berapapun tetap satu query pakai index,
+dan export full history dikirim per chunk tanpa numpuk semuanya di memori.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from . import users
+from .models import Review
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 500
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(review):
+    raw = f'{review.created_at.isoformat()}|{review.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, review_id = base64.b64decode(padded.encode(), altchars=b'-_', validate=True).decode().split('|')
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(review_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError('Invalid cursor.')
+
+
+def _after(shoe_id, position):
+    qs = Review.objects.filter(shoe_id=shoe_id).order_by('-created_at', '-id')
+    if position is not None:
+        created_at, review_id = position
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=review_id))
+    return qs
+
+
+def format_review(review, usernames):
+    display_name = users.display_name(usernames, review.user_id)
+    return {
+        'id': review.id,
+        'user': display_name,
+        'avatar': f"https://api.dicebear.com/7.x/avataaars/svg?seed={display_name}",
+        'date': review.created_at.isoformat()[:10] if review.created_at else '',
+        'text': review.review_text or '',
+        'rating': review.rating,
+    }
+
+
+def get_page(shoe_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (list review siap kirim, cursor halaman berikutnya atau None)."""
+    position = decode_cursor(cursor) if cursor else None
+    rows = list(_after(shoe_id, position)[:limit + 1])  # +1 buat tahu masih ada halaman lagi
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    usernames = users.resolve_usernames(review.user_id for review in rows)
+    next_cursor = encode_cursor(rows[-1]) if has_more else None
+    return [format_review(review, usernames) for review in rows], next_cursor
+
+
+def iter_ndjson(shoe_id, chunk_size=None):
+    """Generator baris NDJSON semua review sepatu, diambil per chunk (memori tetap kecil)."""
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    position = None
+    while True:
+        rows = list(_after(shoe_id, position)[:chunk_size])
+        if not rows:
+            return
+        usernames = users.resolve_usernames(review.user_id for review in rows)
+        for review in rows:
+            yield json.dumps(format_review(review, usernames)) + '\n'
+        if len(rows) < chunk_size:
+            return
+        position = (rows[-1].created_at, rows[-1].id)
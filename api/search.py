@@ -0,0 +1,236 @@
+"""
+Search engine lokal untuk /api/shoes/search/.
+
+Index dibangun sekali dari snapshot katalog (api/catalog.py) dan otomatis dibangun
+ulang begitu katalog berubah. Isinya:
+- inverted index: token -> {posisi sepatu: bobot}  (name > brand > description)
+- daftar token terurut buat cari prefix pakai bisect ("pega" -> "pegasus"). Token
+  nama & brand punya daftar sendiri dan selalu diekspansi semua; token deskripsi
+  dibatasi MAX_PREFIX_EXPANSION, diambil yang paling banyak dipakai sepatu
+- trigram index buat toleransi typo ("pegasis" -> "pegasus")
+
+Semua di memori, jadi satu pencarian cuma hitungan mikrodetik, gak ada round-trip
+ke database per ketikan.
+"""
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+
+# Bobot per kolom: ketemu di nama lebih penting daripada di deskripsi
+FIELD_WEIGHTS = (('name', 3.0), ('brand', 2.0), ('description', 1.0))
+
+# Pengali skor sesuai cara tokennya ketemu
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.4
+
+MAX_PREFIX_EXPANSION = 64  # khusus token deskripsi
+TITLE_FIELDS = ('name', 'brand')
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Huruf kecil + buang aksen ("Saucony Endorphin Pró" -> "saucony endorphin pro")."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein, berhenti lebih awal kalau udah pasti lewat `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    def __init__(self, snapshot):
+        self.shoes = snapshot.shoes
+        self.names = [normalize(shoe.get('name')) for shoe in self.shoes]
+        self.postings = {}
+        title_terms = set()
+
+        for doc, shoe in enumerate(self.shoes):
+            for field, weight in FIELD_WEIGHTS:
+                for token in set(tokenize(shoe.get(field))):
+                    docs = self.postings.setdefault(token, {})
+                    docs[doc] = docs.get(doc, 0) + weight
+                    if field in TITLE_FIELDS:
+                        title_terms.add(token)
+
+        self.vocabulary = sorted(self.postings)
+        # Kata deskripsi (jauh lebih banyak) gak boleh nutupin nama/brand waktu ekspansi prefix
+        self.title_vocabulary = sorted(title_terms)
+        self.trigram_index = {}
+        for token in self.vocabulary:
+            for gram in trigrams(token):
+                self.trigram_index.setdefault(gram, set()).add(token)
+
+    @staticmethod
+    def _prefix_range(vocabulary, token):
+        # Token cuma [a-z0-9], jadi semua yang diawali `token` ada sebelum token + '{'
+        return vocabulary[bisect_left(vocabulary, token):bisect_left(vocabulary, token + '{')]
+
+    def _prefix_terms(self, token):
+        terms = self._prefix_range(self.title_vocabulary, token)
+        title = set(terms)
+        others = [term for term in self._prefix_range(self.vocabulary, token) if term not in title]
+        if len(others) > MAX_PREFIX_EXPANSION:
+            others = heapq.nlargest(MAX_PREFIX_EXPANSION, others, key=lambda term: len(self.postings[term]))
+        return terms + others
+
+    def _fuzzy_terms(self, token):
+        grams = trigrams(token)
+        shared = {}
+        for gram in grams:
+            for term in self.trigram_index.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        limit = 1 if len(token) <= 5 else 2
+        terms = []
+        for term, count in shared.items():
+            similarity = count / len(grams | trigrams(term))
+            if similarity >= MIN_TRIGRAM_SIMILARITY and edit_distance(token, term, limit) <= limit:
+                terms.append(term)
+        return terms
+
+    def _match_token(self, token):
+        """Skor per sepatu untuk satu token query (ambil cara match terbaik)."""
+        scores = {}
+
+        def add(term, multiplier):
+            for doc, weight in self.postings[term].items():
+                score = weight * multiplier
+                if score > scores.get(doc, 0):
+                    scores[doc] = score
+
+        for term in self._prefix_terms(token):
+            add(term, EXACT if term == token else PREFIX)
+        if not scores and len(token) >= 3:
+            for term in self._fuzzy_terms(token):
+                add(term, FUZZY)
+        return scores
+
+    def search(self, query, limit=None):
+        """Return baris sepatu yang cocok, urut dari yang paling relevan."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        # Semua token query harus ketemu (AND), skornya dijumlah
+        totals = None
+        for token in tokens:
+            scores = self._match_token(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {doc: totals[doc] + score for doc, score in scores.items() if doc in totals}
+            if not totals:
+                return []
+
+        # Bonus kalau query utuh muncul di nama, apalagi di awal nama
+        phrase = ' '.join(tokens)
+        for doc in totals:
+            name = self.names[doc]
+            if name.startswith(phrase):
+                totals[doc] += 2.0
+            elif phrase in name:
+                totals[doc] += 1.0
+
+        rank_key = lambda doc: (-totals[doc], self.names[doc])
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, totals, key=rank_key)
+        else:
+            ranked = sorted(totals, key=rank_key)
+        return [self.shoes[doc] for doc in ranked]
+
+
+def _key(text):
+    return ' '.join(tokenize(text))
+
+
+class SuggestIndex:
+    """
+    Autocomplete brand & model. Semua key dinormalisasi lalu diurutkan sekali,
+    jadi cari prefix = bisect + ambil k item pertama (O(log n + k)).
+    """
+
+    def __init__(self, snapshot):
+        brands = {}
+        models = []
+        for shoe in snapshot.shoes:
+            brand, name = shoe.get('brand') or '', shoe.get('name') or ''
+            if brand:
+                brands.setdefault(_key(brand), brand)
+            entry = {'id': shoe['shoe_id'], 'slug': shoe.get('slug'), 'name': name, 'brand': brand}
+            # Bisa ketik nama model langsung ("pega...") atau diawali brand ("nike pe...")
+            models.append((_key(name), entry))
+            if brand:
+                models.append((_key(f'{brand} {name}'), entry))
+
+        self.brand_keys = sorted(brands)
+        self.brand_names = [brands[key] for key in self.brand_keys]
+        models.sort(key=lambda item: (item[0], item[1]['id']))
+        self.model_keys = [key for key, _ in models]
+        self.model_entries = [entry for _, entry in models]
+
+    @staticmethod
+    def _range(keys, prefix, limit):
+        start = bisect_left(keys, prefix)
+        end = start
+        while end < len(keys) and end - start < limit and keys[end].startswith(prefix):
+            end += 1
+        return start, end
+
+    def suggest(self, prefix, limit=8):
+        prefix = _key(prefix)
+        if not prefix:
+            return {'brands': [], 'models': []}
+
+        start, end = self._range(self.brand_keys, prefix, limit)
+        brands = self.brand_names[start:end]
+
+        # Satu model bisa ketemu dua kali (lewat nama & brand+nama), ambil sekali aja
+        models, seen = [], set()
+        start = bisect_left(self.model_keys, prefix)
+        for i in range(start, len(self.model_keys)):
+            if len(models) >= limit or not self.model_keys[i].startswith(prefix):
+                break
+            entry = self.model_entries[i]
+            if entry['id'] not in seen:
+                seen.add(entry['id'])
+                models.append(entry)
+        return {'brands': brands, 'models': models}
+
+
+def get_suggest_index(snapshot):
+    return snapshot.derived('suggest', SuggestIndex)
+
+
+def suggest(snapshot, prefix, limit=8):
+    return get_suggest_index(snapshot).suggest(prefix, limit=limit)
+
+
+def get_index(snapshot):
+    return snapshot.derived('search', SearchIndex)
+
+
+def search(snapshot, query, limit=None):
+    return get_index(snapshot).search(query, limit=limit)
@@ -0,0 +1,65 @@
+"""
+Payload JSON detail sepatu yang udah di-render ke bytes, sekali per snapshot katalog.
+
+ShoeSerializer(fields='__all__') ngecek ~45 field satu-satu tiap dipanggil, padahal
+isinya cuma berubah kalau katalog berubah. Di sini bagian statisnya (semua kolom
+tabel shoes + mainImage + model) di-render SEKALI jadi bytes dan disimpan per
+snapshot (snapshot.derived), jadi otomatis ikut basi begitu versi katalog ganti.
+
+Field yang tergantung request (rating, isFavorite, reviews, dst) di-render terpisah
+lalu ditempel ke belakang bytes statisnya:
+
+    body = shoe_payloads.render(snapshot, shoe, {'rating': 4.5, 'isFavorite': True})
+    return HttpResponse(body, content_type='application/json')
+"""
+from .renderers import ORJSONRenderer
+from .serializers import ShoeSerializer
+
+_renderer = ORJSONRenderer()
+
+
+def build_static(shoe):
+    """Bagian payload yang sama buat semua request (sama kayak output lama)."""
+    data = dict(ShoeSerializer(shoe).data)
+    data['mainImage'] = shoe.get('img_url')
+    data['model'] = shoe.get('name')
+    return data
+
+
+def _cache(snapshot):
+    return snapshot.derived('payloads', lambda _: {})
+
+
+def get_static(snapshot, shoe):
+    """Bytes JSON bagian statis satu sepatu (di-render kalau belum ada)."""
+    payloads = _cache(snapshot)
+    shoe_id = shoe['shoe_id']
+    body = payloads.get(shoe_id)
+    if body is None:
+        # Dua thread bisa render barengan, hasilnya sama, jadi gak perlu lock
+        body = payloads.setdefault(shoe_id, _renderer.render(build_static(shoe)))
+    return body
+
+
+def render_all(snapshot):
+    """Render semua sepatu sekaligus (dipanggil warm_up). Return jumlah sepatu."""
+    for shoe in snapshot.shoes:
+        get_static(snapshot, shoe)
+    return len(snapshot.shoes)
+
+
+def merge(static, dynamic):
+    """Tempel objek JSON `dynamic` (bytes) ke belakang objek JSON `static` (bytes)."""
+    if dynamic == b'{}':
+        return static
+    if static == b'{}':
+        return dynamic
+    return static[:-1] + b',' + dynamic[1:]
+
+
+def render(snapshot, shoe, dynamic=None):
+    """Payload lengkap satu sepatu: bagian statis dari cache + field dinamis."""
+    static = get_static(snapshot, shoe)
+    if not dynamic:
+        return static
+    return merge(static, _renderer.render(dynamic))
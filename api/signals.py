@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import authentication, availability, catalog, tokens, users
+from .models import Shoe, User
+
+
+# Data sepatu berubah lewat ORM/admin -> cache katalog semua worker dianggap basi.
+# Versinya dinaikin SETELAH commit: kalau sebelum, worker lain bisa keburu load data
+# lama lalu nyimpennya di bawah versi baru (basi sampai CATALOG_CACHE_TTL).
+@receiver(post_save, sender=Shoe)
+@receiver(post_delete, sender=Shoe)
+def invalidate_catalog(sender, **kwargs):
+    transaction.on_commit(catalog.invalidate)
+
+
+# Username bisa berubah -> buang dari cache resolver di worker ini
+@receiver(post_save, sender=User)
+def forget_username(sender, instance, **kwargs):
+    users.forget(instance.id)
+
+
+# Filter username/email (api/availability.py): user baru ditambahin, kalau
+# username/email mungkin berubah semua worker bangun ulang
+@receiver(post_save, sender=User)
+def update_availability(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        availability.user_created(instance)
+    elif update_fields is None or {'username', 'email'} & set(update_fields):
+        availability.user_changed(instance)
+
+
+# Password / status aktif bisa berubah -> user di cache token auth harus dibaca ulang
+@receiver(post_save, sender=User)
+def revoke_cached_auth(sender, instance, created, **kwargs):
+    if not created:
+        authentication.revoke_user(instance.id)
+
+
+# Token dihapus (logout / admin) -> login berikutnya jangan dikasih key lama dari cache
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    tokens.forget(instance.user_id)
+    authentication.revoke(instance.key)
@@ -0,0 +1,65 @@
+"""
+"Sepatu serupa" untuk halaman detail.
+
+Kedekatan dihitung dari ukuran lab yang dinormalisasi (berat, drop, stack, kekakuan,
+energy return, dst) plus flag terrain & pace. Daftar k tetangga terdekat untuk
+SEMUA sepatu dihitung sekali per snapshot katalog (blok demi blok biar memori
+aman), jadi request detail cuma lookup tabel, gak scan katalog.
+"""
+import numpy as np
+
+from .recommend import normalize_columns
+
+FEATURES = (
+    'weight_lab_oz', 'drop_lab_mm', 'heel_lab_mm', 'forefoot_lab_mm',
+    'stiffness_scaled', 'energy_return', 'shock_absorption',
+    'terrain_light', 'terrain_moderate', 'terrain_technical',
+    'pace_daily_running', 'pace_tempo', 'pace_competition',
+)
+
+K = 6
+BLOCK_SIZE = 512
+
+
+class NeighbourTable:
+    def __init__(self, snapshot, k=K):
+        self.shoes = snapshot.shoes
+        self.position = {shoe['shoe_id']: i for i, shoe in enumerate(self.shoes)}
+        raw = np.array(
+            [[np.nan if shoe.get(name) is None else float(shoe[name]) for name in FEATURES] for shoe in self.shoes],
+            dtype=np.float64,
+        ).reshape(len(self.shoes), len(FEATURES))
+        self.neighbours = build_neighbours(normalize_columns(raw).astype(np.float32), k)
+
+
+def build_neighbours(points, k):
+    """Top-k tetangga (jarak euclid) tiap baris -> array (n, k) index, urut dari terdekat."""
+    n = len(points)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int32)
+
+    squared = (points ** 2).sum(axis=1)
+    result = np.empty((n, k), dtype=np.int32)
+    for start in range(0, n, BLOCK_SIZE):
+        block = points[start:start + BLOCK_SIZE]
+        distance = squared[start:start + len(block), None] + squared[None, :] - 2.0 * (block @ points.T)
+        rows = np.arange(len(block))
+        distance[rows, start + rows] = np.inf  # jangan rekomendasiin dirinya sendiri
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distance, nearest, axis=1), axis=1, kind='stable')
+        result[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+    return result
+
+
+def get_table(snapshot):
+    return snapshot.derived('similar', NeighbourTable)
+
+
+def similar_to(snapshot, shoe_id, limit=K):
+    """Baris sepatu paling mirip dengan shoe_id (kosong kalau gak ada di katalog)."""
+    table = get_table(snapshot)
+    position = table.position.get(shoe_id)
+    if position is None:
+        return []
+    return [table.shoes[i] for i in table.neighbours[position][:limit]]
@@ -1,11 +1,198 @@
+# Client Supabase khusus buat auth (sign up, OTP, reset password).
+# Data tabel (shoes, reviews, favorites) dibaca lewat ORM Django, bukan PostgREST.
+#
+# Semua request HTTP ke Supabase lewat satu httpx.Client yang di-share:
+# - pool koneksi terbatas + keep-alive + HTTP/2 (gak handshake TLS tiap panggilan)
+# - timeout per panggilan, jadi satu request Supabase yang lemot gak nahan worker selamanya
+# - circuit breaker: kalau Supabase gagal terus, panggilan berikutnya langsung ditolak
+#   (CircuitOpenError) selama cooldown, bukan ikut nunggu timeout satu-satu
+# - statistik latency & gagal per layanan (auth/rest/storage), lihat get_stats()
 import os
-from supabase import create_client, Client
+import threading
+import time
+from collections import deque
+
+import httpx
+from django.conf import settings
+from supabase import create_client, Client, ClientOptions
+
+LATENCY_SAMPLES = 500  # sampel latency terakhir per layanan buat hitung p50/p99
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Supabase lagi dianggap down, panggilan gak dikirim sama sekali."""
+
+
+class CircuitBreaker:
+    """
+    closed -> (gagal berturut-turut >= threshold) -> open
+    open -> (lewat cooldown) -> half-open: satu panggilan percobaan boleh lewat
+    half-open -> sukses: closed, gagal: open lagi
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class _ServiceStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms=None, failed=False, rejected=False):
+        with self._lock:
+            if rejected:
+                self.rejected += 1
+                return
+            self.calls += 1
+            self.failures += failed
+            if latency_ms is not None:
+                self.latencies.append(latency_ms)
+
+    def as_dict(self):
+        with self._lock:
+            samples = sorted(self.latencies)
+
+        def percentile(fraction):
+            return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 2) if samples else None
+
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'p50_ms': percentile(0.5),
+            'p99_ms': percentile(0.99),
+        }
+
+
+def _service_of(request):
+    # URL Supabase: /auth/v1/..., /rest/v1/..., /storage/v1/..., /functions/v1/...
+    return request.url.path.strip('/').split('/', 1)[0] or 'other'
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """Transport httpx yang nyatet statistik + jaga circuit breaker."""
+
+    def __init__(self, breaker, **kwargs):
+        super().__init__(**kwargs)
+        self.breaker = breaker
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _stats_for(self, service):
+        with self._stats_lock:
+            return self.stats.setdefault(service, _ServiceStats())
+
+    def handle_request(self, request):
+        stats = self._stats_for(_service_of(request))
+        if not self.breaker.allow():
+            stats.record(rejected=True)
+            raise CircuitOpenError('Supabase circuit breaker is open.', request=request)
+
+        started = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except httpx.TransportError:
+            stats.record(failed=True)
+            self.breaker.record_failure()
+            raise
+
+        # 4xx = salah input user (OTP salah dll), bukan tanda Supabase-nya rusak
+        failed = response.status_code >= 500
+        stats.record((time.perf_counter() - started) * 1000, failed=failed)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+
+def create_http_client(**overrides):
+    """httpx.Client dengan pool, HTTP/2, timeout & breaker sesuai settings.SUPABASE_HTTP."""
+    config = {**settings.SUPABASE_HTTP, **overrides}
+    breaker = CircuitBreaker(config['breaker_threshold'], config['breaker_cooldown'])
+    transport = InstrumentedTransport(
+        breaker,
+        http2=config['http2'],
+        retries=0,  # retry diatur pemanggil, bukan diam-diam di sini
+        limits=httpx.Limits(
+            max_connections=config['max_connections'],
+            max_keepalive_connections=config['max_keepalive'],
+            keepalive_expiry=config['keepalive_expiry'],
+        ),
+    )
+    timeout = httpx.Timeout(config['timeout'], connect=config['connect_timeout'])
+    return httpx.Client(transport=transport, timeout=timeout)
+
+
+def create_supabase_client(url=None, key=None, http_client=None):
+    """Bikin client Supabase yang pakai http client di atas. None kalau env-nya kosong."""
+    url = url or os.environ.get("SUPABASE_URL")
+    key = key or os.environ.get("SUPABASE_KEY")
+    if not (url and key):
+        return None
+    options = ClientOptions(
+        httpx_client=http_client or create_http_client(),
+        postgrest_client_timeout=settings.SUPABASE_HTTP['timeout'],
+        auto_refresh_token=False,  # server gak butuh timer refresh session di background
+    )
+    return create_client(url, key, options=options)
+
+
+def get_stats():
+    """Statistik per layanan + status breaker (dipakai endpoint admin)."""
+    transport = getattr(getattr(supabase, 'options', None), 'httpx_client', None)
+    transport = getattr(transport, '_transport', None)
+    if not isinstance(transport, InstrumentedTransport):
+        return {'configured': False}
+    return {
+        'configured': True,
+        'breaker': {
+            'state': transport.breaker.state,
+            'consecutive_failures': transport.breaker.failures,
+        },
+        'services': {service: stats.as_dict() for service, stats in sorted(transport.stats.items())},
+    }
 
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
 
 # Kasih pengecekan biar gak error kalau variable-nya kosong
-if url and key:
-    supabase: Client = create_client(url, key)
-else:
-    supabase = None
\ No newline at end of file
+supabase: Client = create_supabase_client()
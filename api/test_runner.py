@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Cache di memori proses test: jangan sampai nyentuh file cache server di mesin yang
+# sama (/tmp/sonix-cache), dan test yang jalan paralel gak saling ganggu
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'sonix-test-{alias}'}
+    for alias in ('default', 'state')
+}
+
+
+class ManagedModelTestRunner(DiscoverRunner):
+    """
+    Tabel shoes/reviews/favorites aslinya punya Supabase (managed = False), jadi
+    gak dibikin sama migration di database test. Runner ini bikin tabelnya manual
+    setelah database test siap. Cache juga diganti ke LocMemCache selama test.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        self._cache_override = override_settings(CACHES=TEST_CACHES)
+        self._cache_override.enable()
+        super().setup_test_environment(**kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        self._cache_override.disable()
+
+    def setup_databases(self, **kwargs):
+        old_config = super().setup_databases(**kwargs)
+        unmanaged_models = [model for model in apps.get_app_config('api').get_models() if not model._meta.managed]
+        for alias in connections:
+            with connections[alias].schema_editor() as editor:
+                for model in unmanaged_models:
+                    editor.create_model(model)
+        return old_config
@@ -1,3 +1,1053 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import numpy as np
+
+from django.core.cache import cache as django_cache, caches
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .renderers import ORJSONRenderer
+from .serializers import ShoeSerializer
+from .models import Favorite, Review, Shoe, User, UserProfile, ShoeRatingSummary
+from . import async_views, authentication, availability, catalog, compression, jobs, last_login, supabase_client, facets, favorites, ratings, recommend, review_buffer, reviews, search, shoe_payloads, similar, users, versions
+
+
+# ============================================================================
+# Helper data
+# ============================================================================
+
+def make_shoes(n):
+    return [
+        {'id': i, 'shoe_id': f'R{i:03d}', 'name': f'Alpha Runner {i}', 'brand': 'Acme', 'slug': f'alpha-runner-{i}', 'img_url': None}
+        for i in range(n)
+    ]
+
+
+def clear_caches():
+    for alias in ('default', 'state'):
+        caches[alias].clear()
+
+
+def create_shoes(n):
+    """Sama kayak make_shoes tapi beneran masuk tabel shoes (buat test lewat ORM)."""
+    return Shoe.objects.bulk_create(
+        Shoe(**{k: v for k, v in shoe.items() if k != 'id'}) for shoe in make_shoes(n)
+    )
+
+
+# ============================================================================
+# Rating service
+# ============================================================================
+
+class RatingServiceTests(TestCase):
+    def test_record_review_updates_summary_incrementally(self):
+        for rating in (5, 4, 5):
+            ratings.record_review('R001', rating)
+        summary = ShoeRatingSummary.objects.get(shoe_id='R001')
+        self.assertEqual((summary.review_count, summary.rating_sum), (3, 14))
+        self.assertEqual(summary.histogram, {'1': 0, '2': 0, '3': 0, '4': 1, '5': 2})
+        self.assertEqual(summary.average, 4.7)
+
+    def test_rating_map_uses_single_query(self):
+        for i in range(50):
+            ratings.record_review(f'R{i:03d}', 1 + i % 5)
+        with self.assertNumQueries(1):
+            rating_map = ratings.get_rating_map([f'R{i:03d}' for i in range(50)])
+        self.assertEqual(rating_map['R000'], 1.0)
+        self.assertEqual(len(rating_map), 50)
+
+    def test_rating_map_empty_ids_skips_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(ratings.get_rating_map([]), {})
+
+
+class SearchQueryBudgetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        favorites.clear_cache()
+
+    def _search(self, n_shoes, user=None, queries=2):
+        for shoe in create_shoes(n_shoes):
+            ratings.record_review(shoe.shoe_id, 4)
+        if user:
+            self.client.force_authenticate(user)
+        cache = catalog.CatalogCache(ttl=60)
+        with mock.patch.object(catalog, 'catalog_cache', cache):
+            # Request pertama: 1 query load katalog (ORM) + 1 query rating
+            with self.assertNumQueries(queries):
+                res = self.client.get('/api/shoes/search/', {'q': 'alpha'})
+            # Request kedua: katalog & favorit udah di memori, cuma query rating
+            with self.assertNumQueries(1):
+                self.client.get('/api/shoes/search/', {'q': 'alpha'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()), n_shoes)
+        self.assertTrue(all(item['rating'] == 4.0 for item in res.json()))
+        self.assertTrue(all(item['id'] == item['shoe_id'] for item in res.json()))
+        return res.json()
+
+    def test_budget_does_not_grow_with_results(self):
+        self._search(3)
+        Shoe.objects.all().delete()
+        self._search(200)
+
+    def test_budget_for_authenticated_user(self):
+        user = User.objects.create_user(username='runner', email='runner@example.com', password='pass12345')
+        Favorite.objects.create(user=user, shoe_id='R007')
+        results = self._search(100, user=user, queries=3)  # + sekali load bitmap favorit
+        self.assertEqual([item['shoe_id'] for item in results if item['isFavorite']], ['R007'])
+
+
+# ============================================================================
+# Cache katalog
+# ============================================================================
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.loads = 0
+
+    def _loader(self):
+        self.loads += 1
+        return make_shoes(3)
+
+    def test_loads_once_until_ttl_expires(self):
+        cache = catalog.CatalogCache(loader=self._loader, ttl=60, generation_poll=0)
+        first = cache.get()
+        self.assertIs(cache.get(), first)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(first.by_slug['alpha-runner-1']['shoe_id'], 'R001')
+
+        cache._expires_at = 0
+        self.assertIsNot(cache.get(), first)
+        self.assertEqual(self.loads, 2)
+
+    def test_invalidate_from_other_process_is_seen(self):
+        cache = catalog.CatalogCache(loader=self._loader, ttl=60, generation_poll=0)
+        cache.get()
+        versions.bump_version(catalog.VERSION_NAME)  # misal dari management command
+        cache.get()
+        self.assertEqual(self.loads, 2)
+
+    def test_tests_do_not_touch_the_server_file_cache(self):
+        for alias in ('default', 'state'):
+            self.assertEqual(type(caches[alias]).__name__, 'LocMemCache')
+        versions.bump_version('probe')  # versions ikut cache yang di-override
+        self.assertIsNotNone(caches['state'].get(versions.KEY_PREFIX + 'probe'))
+
+    def test_shoe_change_bumps_version_only_after_commit(self):
+        before = versions.get_version(catalog.VERSION_NAME)
+        with self.captureOnCommitCallbacks(execute=True):
+            Shoe.objects.create(shoe_id='R001', name='Alpha', slug='alpha')
+            self.assertEqual(versions.get_version(catalog.VERSION_NAME), before)
+        self.assertNotEqual(versions.get_version(catalog.VERSION_NAME), before)
+
+    def test_stale_snapshot_served_while_another_request_refreshes(self):
+        cache = catalog.CatalogCache(loader=self._loader, ttl=60, generation_poll=0)
+        stale = cache.get()
+        cache._expires_at = 0
+        with cache._refresh_lock:  # pura-pura request lain lagi refresh
+            self.assertIs(cache.get(), stale)
+        self.assertEqual(self.loads, 1)
+
+    def test_failed_refresh_keeps_serving_stale_copy(self):
+        cache = catalog.CatalogCache(loader=self._loader, ttl=60, generation_poll=0)
+        stale = cache.get()
+        cache.loader = mock.Mock(side_effect=RuntimeError('database down'))
+        cache._expires_at = 0
+        self.assertIs(cache.get(), stale)
+
+
+# ============================================================================
+# Search index
+# ============================================================================
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.snapshot = catalog.CatalogSnapshot([
+            {'shoe_id': 'R001', 'name': 'Pegasus 41', 'brand': 'Nike', 'slug': 'pegasus-41', 'description': 'Daily trainer'},
+            {'shoe_id': 'R002', 'name': 'Vomero 18', 'brand': 'Nike', 'slug': 'vomero-18', 'description': 'Softer than the Pegasus'},
+            {'shoe_id': 'R003', 'name': 'Endorphin Speed', 'brand': 'Saucony', 'slug': 'endorphin-speed', 'description': 'Nylon plate'},
+        ])
+
+    def _ids(self, query):
+        return [shoe['shoe_id'] for shoe in search.search(self.snapshot, query)]
+
+    def test_name_match_ranks_above_description(self):
+        self.assertEqual(self._ids('pegasus'), ['R001', 'R002'])
+
+    def test_prefix_and_brand(self):
+        self.assertEqual(self._ids('endor'), ['R003'])
+        self.assertEqual(self._ids('NIKE vom'), ['R002'])
+
+    def test_short_prefix_always_expands_names_and_brands(self):
+        # Banyak kata deskripsi berawalan "a" yang urut abjadnya sebelum "asics"
+        filler = ' '.join(f'a{i:03d}' for i in range(100))
+        snapshot = catalog.CatalogSnapshot([
+            {'shoe_id': 'R001', 'name': 'Novablast 5', 'brand': 'Asics', 'slug': 'novablast-5', 'description': 'Bouncy'},
+            {'shoe_id': 'R002', 'name': 'Filler', 'brand': 'Other', 'slug': 'filler', 'description': filler},
+        ])
+        self.assertIn('R001', [shoe['shoe_id'] for shoe in search.search(snapshot, 'a')])
+        self.assertIn('R002', [shoe['shoe_id'] for shoe in search.search(snapshot, 'a')])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self._ids('saucny'), ['R003'])
+        self.assertEqual(self._ids('pegasis')[0], 'R001')
+
+    def test_index_is_built_once_per_snapshot(self):
+        self.assertIs(search.get_index(self.snapshot), search.get_index(self.snapshot))
+
+
+class SuggestTests(TestCase):
+    def test_brand_and_model_completions(self):
+        snapshot = catalog.CatalogSnapshot([
+            {'shoe_id': 'R001', 'name': 'Pegasus 41', 'brand': 'Nike', 'slug': 'pegasus-41', 'description': 'x'},
+            {'shoe_id': 'R002', 'name': 'Peregrine 14', 'brand': 'Saucony', 'slug': 'peregrine-14', 'description': 'y'},
+        ])
+        cache = catalog.CatalogCache(loader=lambda: snapshot.shoes, ttl=60)
+        with mock.patch.object(catalog, 'catalog_cache', cache):
+            res = APIClient().get('/api/shoes/suggest/', {'q': 'Pe'})
+            by_brand = APIClient().get('/api/shoes/suggest/', {'q': 'nike p'})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([m['id'] for m in res.json()['models']], ['R001', 'R002'])
+        self.assertEqual(res.json()['models'][0], {'id': 'R001', 'slug': 'pegasus-41', 'name': 'Pegasus 41', 'brand': 'Nike'})
+        self.assertEqual(by_brand.json(), {'brands': [], 'models': [res.json()['models'][0]]})
+        self.assertEqual(search.suggest(snapshot, 'sau')['brands'], ['Saucony'])
+
+
+# ============================================================================
+# Rekomendasi
+# ============================================================================
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.snapshot = catalog.CatalogSnapshot([
+            {'shoe_id': 'N1', 'name': 'Neutral Narrow', 'arch_neutral': 1, 'arch_stability': 0, 'width_fit': 1, 'toebox_width': 1},
+            {'shoe_id': 'S1', 'name': 'Stable Wide', 'arch_neutral': 0, 'arch_stability': 1, 'width_fit': 5, 'toebox_width': 5, 'removable_insole': 1},
+            {'shoe_id': 'S2', 'name': 'Stable Narrow', 'arch_neutral': 0, 'arch_stability': 1, 'width_fit': 1, 'toebox_width': None},
+        ])
+
+    def _ranked(self, **profile):
+        matches = recommend.recommend(self.snapshot, UserProfile(**profile), limit=3)
+        return [shoe['shoe_id'] for shoe, _ in matches]
+
+    def test_profile_drives_ranking(self):
+        self.assertEqual(self._ranked(foot_width='Wide', arch_type='Flat', uses_orthotics=True), ['S1', 'S2', 'N1'])
+        self.assertEqual(self._ranked(foot_width='Narrow', arch_type='High', uses_orthotics=False)[0], 'N1')
+
+    def test_endpoint_requires_profile(self):
+        user = User.objects.create_user(username='runner', email='runner@example.com', password='pass12345')
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/recommendations/').status_code, 404)
+
+        UserProfile.objects.create(user=user, foot_width='Wide', arch_type='Flat', uses_orthotics=True)
+        cache = catalog.CatalogCache(loader=lambda: self.snapshot.shoes, ttl=60)
+        with mock.patch.object(catalog, 'catalog_cache', cache):
+            res = client.get('/api/recommendations/', {'limit': 2})
+        self.assertEqual([item['shoe_id'] for item in res.json()], ['S1', 'S2'])
+        self.assertTrue(0 <= res.json()[1]['match_score'] <= res.json()[0]['match_score'] <= 100)
+
+
+class SimilarShoesTests(TestCase):
+    def test_neighbours_by_lab_features(self):
+        shoes = [
+            {'shoe_id': 'A', 'weight_lab_oz': 7.0, 'drop_lab_mm': 8, 'terrain_light': 1, 'pace_competition': 1},
+            {'shoe_id': 'B', 'weight_lab_oz': 7.2, 'drop_lab_mm': 8, 'terrain_light': 1, 'pace_competition': 1},
+            {'shoe_id': 'C', 'weight_lab_oz': 11.0, 'drop_lab_mm': 4, 'terrain_technical': 1},
+            {'shoe_id': 'D', 'weight_lab_oz': 10.5, 'drop_lab_mm': 4, 'terrain_technical': 1},
+        ]
+        snapshot = catalog.CatalogSnapshot(shoes)
+        self.assertEqual([s['shoe_id'] for s in similar.similar_to(snapshot, 'A', limit=2)], ['B', 'D'])
+        self.assertEqual(similar.similar_to(snapshot, 'C', limit=1)[0]['shoe_id'], 'D')
+        self.assertEqual(similar.similar_to(snapshot, 'missing'), [])
+
+    def test_blocked_build_matches_brute_force(self):
+        points = np.random.default_rng(0).random((50, 5)).astype(np.float32)
+        with mock.patch.object(similar, 'BLOCK_SIZE', 7):
+            table = similar.build_neighbours(points, 3)
+        distance = ((points[:, None] - points[None]) ** 2).sum(-1)
+        np.fill_diagonal(distance, np.inf)
+        np.testing.assert_array_equal(table, np.argsort(distance, axis=1)[:, :3])
+
+
+# ============================================================================
+# Filter & facet
+# ============================================================================
+
+class FacetFilterTests(TestCase):
+    def setUp(self):
+        self.shoes = [
+            {'shoe_id': 'R001', 'terrain_light': 1, 'pace_tempo': 1, 'waterproof': 0, 'weight_lab_oz': 8.0},
+            {'shoe_id': 'R002', 'terrain_light': 1, 'pace_competition': 1, 'plate_carbon_plate': 1, 'weight_lab_oz': 6.5},
+            {'shoe_id': 'R003', 'terrain_technical': 1, 'pace_tempo': 1, 'waterproof': 1, 'weight_lab_oz': 10.2},
+            {'shoe_id': 'R004', 'terrain_moderate': 1, 'waterproof': 1, 'weight_lab_oz': None},
+        ]
+        self.cache = catalog.CatalogCache(loader=lambda: self.shoes, ttl=60)
+
+    def _get(self, **params):
+        with mock.patch.object(catalog, 'catalog_cache', self.cache):
+            return APIClient().get('/api/shoes/filter/', params)
+
+    def test_or_within_group_and_across_groups(self):
+        body = self._get(terrain='light,technical', pace='tempo').json()
+        self.assertEqual([s['shoe_id'] for s in body['results']], ['R001', 'R003'])
+        # Facet terrain dihitung tanpa filter terrain sendiri
+        self.assertEqual(body['facets']['terrain'], {'light': 1, 'moderate': 0, 'technical': 1})
+        self.assertEqual(body['facets']['pace']['competition'], 1)
+
+    def test_range_and_sort(self):
+        body = self._get(weight_lab_oz_min=6, weight_lab_oz_max=9, sort='-weight').json()
+        self.assertEqual([s['shoe_id'] for s in body['results']], ['R001', 'R002'])
+        ratings.record_review('R004', 5)
+        body = self._get(waterproof='true', sort='-rating').json()
+        self.assertEqual([(s['shoe_id'], s['rating']) for s in body['results']], [('R004', 5.0), ('R003', 0)])
+
+    def test_unknown_filter_is_rejected(self):
+        self.assertEqual(self._get(terrain='moon').status_code, 400)
+        self.assertEqual(self._get(sort='price').status_code, 400)
+
+
+class CatalogPaginationTests(TestCase):
+    def test_cursor_walks_whole_catalog_with_projection(self):
+        cache = catalog.CatalogCache(loader=lambda: list(reversed(make_shoes(5))), ttl=60)
+        client, seen, params = APIClient(), [], {'limit': 2, 'fields': 'shoe_id,name'}
+        with mock.patch.object(catalog, 'catalog_cache', cache):
+            while True:
+                res = client.get('/api/shoes/', params)
+                self.assertEqual(res.status_code, 200)
+                self.assertTrue(all(set(item) == {'shoe_id', 'name'} for item in res.json()))
+                seen += [item['shoe_id'] for item in res.json()]
+                if 'X-Next-Cursor' not in res:
+                    break
+                params['cursor'] = res['X-Next-Cursor']
+            self.assertEqual(client.get('/api/shoes/', {'cursor': '!!'}).status_code, 400)
+            self.assertEqual(client.get('/api/shoes/', {'fields': 'price'}).status_code, 400)
+        self.assertEqual(seen, ['R000', 'R001', 'R002', 'R003', 'R004'])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        clear_caches()
+
+    def test_304_skips_database_until_ratings_change(self):
+        cache = catalog.CatalogCache(loader=lambda: make_shoes(3), ttl=60)
+        client = APIClient()
+        with mock.patch.object(catalog, 'catalog_cache', cache):
+            first = client.get('/api/shoes/')
+            self.assertEqual(first.status_code, 200)
+            self.assertTrue(first['Cache-Control'].startswith('public'))
+
+            with self.assertNumQueries(0):
+                again = client.get('/api/shoes/', HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(again.status_code, 304)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                ratings.record_review('R001', 5)
+            changed = client.get('/api/shoes/', HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(changed.status_code, 200)
+            self.assertNotEqual(changed['ETag'], first['ETag'])
+
+
+class UsernameResolverTests(TestCase):
+    def test_bulk_resolve_with_cache(self):
+        ids = [User.objects.create_user(username=f'u{i}', email=f'u{i}@example.com').id for i in range(5)]
+        for user_id in ids:
+            users.forget(user_id)
+        with self.assertNumQueries(1):
+            names = users.resolve_usernames(ids + [999999])
+        self.assertEqual(users.display_name(names, ids[0]), 'u0')
+        self.assertEqual(users.display_name(names, 999999), 'User 999999')
+        with self.assertNumQueries(0):
+            users.resolve_usernames(ids)
+
+
+class ReviewListingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='reviewer', email='reviewer@example.com')
+        start = timezone.now()
+        for i in range(25):
+            review = Review.objects.create(shoe_id='R001', user_id=user.id, rating=1 + i % 5, review_text=f'review {i}')
+            # Beberapa review sengaja created_at-nya sama, biar tie-break pakai id ikut dites
+            Review.objects.filter(id=review.id).update(created_at=start + timedelta(minutes=i // 2))
+        self.cache = catalog.CatalogCache(loader=lambda: [{'shoe_id': 'R001', 'name': 'Alpha', 'slug': 'alpha'}], ttl=60)
+
+    def test_keyset_pages_cover_all_reviews_in_order(self):
+        client, texts, params = APIClient(), [], {'limit': 10}
+        with mock.patch.object(catalog, 'catalog_cache', self.cache):
+            while True:
+                body = client.get('/api/shoes/alpha/reviews/', params).json()
+                texts += [item['text'] for item in body['results']]
+                if not body['next_cursor']:
+                    break
+                params['cursor'] = body['next_cursor']
+        self.assertEqual(texts, [f'review {i}' for i in reversed(range(25))])
+
+    def test_ndjson_export_streams_everything(self):
+        with mock.patch.object(catalog, 'catalog_cache', self.cache), mock.patch.object(reviews, 'EXPORT_CHUNK_SIZE', 7):
+            res = APIClient().get('/api/shoes/alpha/reviews/', {'export': 'ndjson'})
+            lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(json.loads(lines[0])['user'], 'reviewer')
+
+    def test_detail_embeds_summary_and_first_page(self):
+        Shoe.objects.create(shoe_id='R001', name='Alpha', slug='alpha')
+        for review in Review.objects.all():
+            ratings.record_review(review.shoe_id, review.rating)
+        with mock.patch.object(catalog, 'catalog_cache', self.cache):
+            body = APIClient().get('/api/shoes/alpha/').json()
+        self.assertEqual(len(body['reviews']), reviews.DEFAULT_PAGE_SIZE)
+        self.assertIsNotNone(body['reviews_next_cursor'])
+        self.assertEqual(body['rating_summary']['count'], 25)
+        self.assertEqual(body['rating_summary']['histogram']['5'], 5)
+
+
+# ============================================================================
+# Favorit
+# ============================================================================
+
+class FavoriteBitmapTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        favorites.clear_cache()
+        self.user = User.objects.create_user(username='fan', email='fan@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(catalog, 'catalog_cache', catalog.CatalogCache(loader=lambda: make_shoes(10), ttl=60))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_toggle_reloads_bitmap_once(self):
+        self.assertEqual(favorites.favorite_ids(self.user.id), set())
+        self.client.post('/api/favorites/toggle/', {'shoe_id': 'R001'})
+        with self.assertNumQueries(1):
+            self.assertTrue(favorites.is_favorite(self.user.id, 'R001'))
+        with self.assertNumQueries(0):
+            self.assertEqual(favorites.favorite_ids(self.user.id, ['R001', 'R002']), {'R001'})
+
+        self.client.post('/api/favorites/toggle/', {'shoe_id': 'R001'})
+        self.assertFalse(favorites.is_favorite(self.user.id, 'R001'))
+
+    def test_concurrent_changes_with_same_version_are_not_lost(self):
+        # Dua worker bump barengan di file cache bisa dapat versi sama: bitmap lama
+        # tetap harus dibuang, bukan di-patch
+        favorites.get_bitmap(self.user.id)
+        version = versions.get_version(favorites.version_name(self.user.id))
+        Favorite.objects.create(user=self.user, shoe_id='R005')  # perubahan "worker lain"
+        with mock.patch.object(versions, 'bump_version', return_value=version + 1), \
+                mock.patch.object(versions, 'get_version', return_value=version + 1):
+            favorites.apply_changes(self.user.id, added=['R006'])
+            self.assertEqual(favorites.favorite_ids(self.user.id), {'R005', 'R006'})
+
+    def test_change_from_other_worker_triggers_reload(self):
+        favorites.get_bitmap(self.user.id)
+        Favorite.objects.create(user=self.user, shoe_id='R009')
+        versions.bump_version(favorites.version_name(self.user.id))  # seolah dari worker lain
+        self.assertTrue(favorites.is_favorite(self.user.id, 'R009'))
+
+    def test_explicit_state_is_idempotent(self):
+        for _ in range(2):
+            res = self.client.post('/api/favorites/toggle/', {'shoe_id': 'R001', 'is_favorite': True})
+            self.assertTrue(res.json()['is_favorite'])
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_sync(self):
+        Favorite.objects.create(user=self.user, shoe_id='R001')
+        res = self.client.post('/api/favorites/bulk/', {'add': ['R002', 'R003', 'R002'], 'remove': ['R001']}, format='json')
+        self.assertEqual(res.json()['favorites'], ['R002', 'R003'])
+        self.assertEqual(sorted(Favorite.objects.values_list('shoe_id', flat=True)), ['R002', 'R003'])
+        bad = self.client.post('/api/favorites/bulk/', {'add': ['R002'], 'remove': ['R002']}, format='json')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_unknown_or_malformed_ids_are_rejected_without_interning(self):
+        interned = len(favorites._intern_ids)
+        for body in ({'add': ['NOPE']}, {'add': [['R001']]}, {'add': [{'a': 1}], 'remove': ['R001']}):
+            self.assertEqual(self.client.post('/api/favorites/bulk/', body, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/favorites/toggle/', {'shoe_id': 'NOPE'}).status_code, 400)
+        self.assertFalse(favorites.is_favorite(self.user.id, 'ALSO-NOPE'))
+        self.assertEqual(favorites.favorite_ids(self.user.id, ['MISSING']), set())
+        self.assertEqual(len(favorites._intern_ids), interned)
+        self.assertFalse(Favorite.objects.exists())
+
+
+# ============================================================================
+# View async (ASGI)
+# ============================================================================
+
+class AsyncReadViewTests(TransactionTestCase):
+    # TransactionTestCase: view async baca DB dari thread lain, jadi datanya harus di-commit
+
+    def setUp(self):
+        clear_caches()
+        favorites.clear_cache()
+        self.addCleanup(self._delete_unmanaged_rows)
+        create_shoes(5)
+        self.user = User.objects.create_user(username='runner', email='runner@example.com', password='pass12345')
+        self.token = Token.objects.create(user=self.user)
+        Favorite.objects.create(user=self.user, shoe_id='R002')
+        Review.objects.create(user_id=self.user.id, shoe_id='R002', rating=5, review_text='Enak')
+        ratings.record_review('R002', 5)
+        self.factory = AsyncRequestFactory()
+        patcher = mock.patch.object(catalog, 'catalog_cache', catalog.CatalogCache(ttl=60))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _delete_unmanaged_rows(self):
+        # Tabel unmanaged gak ikut di-flush TransactionTestCase
+        Review.objects.all().delete()
+        Favorite.objects.all().delete()
+        Shoe.objects.all().delete()
+
+    def _get(self, path, **params):
+        return self.factory.get(path, params, headers={'Authorization': f'Token {self.token.key}'})
+
+    @override_settings(ASYNC_DB_THREADS=2)
+    async def test_db_calls_run_on_small_bounded_pool(self):
+        with mock.patch.object(async_views, '_executor_pid', None):
+            names = await asyncio.gather(*[async_views.run_in_thread(lambda: threading.current_thread().name) for _ in range(20)])
+            self.assertEqual(async_views._executor._max_workers, 2)
+        self.assertTrue(all(name.startswith('async-db') for name in names))
+        self.assertLessEqual(len(set(names)), 2)
+
+    async def test_detail_matches_sync_view(self):
+        res = await async_views.get_shoe_detail(self._get('/api/shoes/alpha-runner-2/'), slug='alpha-runner-2')
+        self.assertEqual(res.status_code, 200)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        expected = await sync_to_async(client.get)('/api/shoes/alpha-runner-2/')
+        self.assertEqual(json.loads(res.content), expected.json())
+        self.assertEqual(res['ETag'], expected['ETag'])
+        self.assertTrue(json.loads(res.content)['isFavorite'])
+
+        cached = self.factory.get('/api/shoes/alpha-runner-2/', headers={'Authorization': f'Token {self.token.key}', 'If-None-Match': res['ETag']})
+        self.assertEqual((await async_views.get_shoe_detail(cached, slug='alpha-runner-2')).status_code, 304)
+
+    async def test_search_and_invalid_token(self):
+        res = await async_views.search_shoes(self._get('/api/shoes/search/', q='alpha'))
+        results = json.loads(res.content)
+        self.assertEqual(len(results), 5)
+        self.assertEqual([item['shoe_id'] for item in results if item['isFavorite']], ['R002'])
+
+        bad = self.factory.get('/api/shoes/search/', {'q': 'alpha'}, headers={'Authorization': 'Token nope'})
+        self.assertEqual((await async_views.search_shoes(bad)).status_code, 401)
+
+    async def test_detail_calls_run_concurrently(self):
+        def slow(func):
+            def wrapper(*args, **kwargs):
+                time.sleep(0.3)
+                return func(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(reviews, 'get_page', slow(reviews.get_page)), \
+                mock.patch.object(ratings, 'get_summaries', slow(ratings.get_summaries)), \
+                mock.patch.object(favorites, 'is_favorite', slow(favorites.is_favorite)):
+            await sync_to_async(catalog.get_snapshot)()
+            started = time.monotonic()
+            res = await async_views.get_shoe_detail(self._get('/api/shoes/alpha-runner-2/'), slug='alpha-runner-2')
+            elapsed = time.monotonic() - started
+        self.assertEqual(res.status_code, 200)
+        self.assertLess(elapsed, 0.6)  # serial = 0.9 detik
+
+
+# ============================================================================
+# Client Supabase (pool, timeout, circuit breaker)
+# ============================================================================
+
+class SupabaseClientTests(TestCase):
+    def setUp(self):
+        self.upstream = mock.Mock(return_value=httpx.Response(500))
+        patcher = mock.patch.object(httpx.HTTPTransport, 'handle_request', lambda transport, request: self.upstream(request))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.http = supabase_client.create_http_client(breaker_threshold=3, breaker_cooldown=60)
+        self.transport = self.http._transport
+
+    def test_breaker_opens_after_repeated_failures(self):
+        for _ in range(3):
+            self.assertEqual(self.http.get('https://x.supabase.co/auth/v1/user').status_code, 500)
+        with self.assertRaises(supabase_client.CircuitOpenError):
+            self.http.get('https://x.supabase.co/auth/v1/user')
+        self.assertEqual(self.upstream.call_count, 3)  # yang ditolak gak dikirim
+        stats = self.transport.stats['auth'].as_dict()
+        self.assertEqual((stats['calls'], stats['failures'], stats['rejected']), (3, 3, 1))
+
+    def test_half_open_trial_closes_breaker(self):
+        for _ in range(3):
+            self.http.get('https://x.supabase.co/auth/v1/user')
+        self.transport.breaker.opened_at -= 60  # cooldown lewat
+        self.upstream.return_value = httpx.Response(400)  # 4xx bukan kegagalan Supabase
+        self.assertEqual(self.http.get('https://x.supabase.co/auth/v1/user').status_code, 400)
+        self.assertEqual(self.transport.breaker.state, 'closed')
+
+    def test_auth_view_returns_503_when_supabase_is_down(self):
+        # Client Supabase asli, cuma transport-nya yang palsu (lihat setUp)
+        client = supabase_client.create_supabase_client('https://x.supabase.co', 'anon-key', http_client=self.http)
+        body = {'username': 'runner', 'email': 'runner@example.com', 'otp': '123456', 'password': 'x'}
+        self.upstream.return_value = httpx.Response(503, json={'msg': 'upstream down'})
+        with mock.patch('api.views.supabase', client):
+            # 503 dari Supabase -> AuthRetryableError
+            for _ in range(3):
+                self.assertEqual(APIClient().post('/api/verify-otp/', body).status_code, 503)
+            # Breaker kebuka -> CircuitOpenError, gak dikirim ke Supabase sama sekali
+            self.assertEqual(APIClient().post('/api/verify-otp/', body).status_code, 503)
+        self.assertEqual(self.upstream.call_count, 3)
+
+        self.upstream.return_value = httpx.Response(403, json={'msg': 'Token has expired or is invalid', 'code': 403})
+        self.transport.breaker.record_success()
+        with mock.patch('api.views.supabase', client):
+            self.assertEqual(APIClient().post('/api/verify-otp/', body).status_code, 400)
+
+    def test_stats_endpoint_is_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='runner', email='r@example.com', password='x'))
+        self.assertEqual(client.get('/api/admin/supabase-stats/').status_code, 403)
+        client.force_authenticate(User.objects.create_superuser(username='admin', email='a@example.com', password='x'))
+        self.assertEqual(client.get('/api/admin/supabase-stats/').status_code, 200)
+
+
+# ============================================================================
+# Login fast path
+# ============================================================================
+
+class LoginFastPathTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='runner', email='runner@example.com', password='pass12345')
+        self.client = APIClient()
+        self.addCleanup(last_login.flush)
+
+    def _login(self, ident, password='pass12345'):
+        return self.client.post('/api/login/', {'username': ident, 'password': password})
+
+    def test_login_by_username_or_email(self):
+        first = self._login('runner')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['token'], Token.objects.get(user=self.user).key)
+        self.assertFalse(first.json()['has_profile'])
+
+        # Token udah di-cache: cuma satu query (ambil user + profile)
+        with self.assertNumQueries(1):
+            second = self._login('runner@example.com')
+        self.assertEqual(second.json()['token'], first.json()['token'])
+
+    def test_username_with_at_sign_and_email_preference(self):
+        odd = User.objects.create_user(username='trail@home', email='trail@example.com', password='other-pass')
+        self.assertEqual(self._login('trail@home', 'other-pass').json()['user_id'], odd.id)
+        # Username ber-'@' tetap satu query (token udah di-cache)
+        with self.assertNumQueries(1):
+            res = self._login('trail@home', 'other-pass')
+        self.assertEqual(res.json()['user_id'], odd.id)
+
+        # Username orang lain = email user ini -> email yang menang
+        User.objects.create_user(username='runner@example.com', email='x@example.com', password='x-pass')
+        self.assertEqual(self._login('runner@example.com').json()['user_id'], self.user.id)
+
+    def test_wrong_credentials(self):
+        self.assertEqual(self._login('runner', 'salah').status_code, 401)
+        self.assertEqual(self._login('nobody@example.com').status_code, 401)
+
+    def test_last_login_written_in_one_batch(self):
+        other = User.objects.create_user(username='walker', email='walker@example.com', password='pass12345')
+        for ident in ('runner', 'walker', 'runner'):
+            self._login(ident)
+        self.assertIsNone(User.objects.get(id=self.user.id).last_login)
+        with self.assertNumQueries(1):
+            self.assertEqual(last_login.flush(), 2)
+        self.assertIsNotNone(User.objects.get(id=other.id).last_login)
+
+    def test_logout_drops_cached_token(self):
+        token = self._login('runner').json()['token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        self.client.post('/api/logout/')
+        self.client.credentials()
+        self.assertNotEqual(self._login('runner').json()['token'], token)
+
+
+# ============================================================================
+# Cache token auth
+# ============================================================================
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        authentication.clear_cache()
+        self.user = User.objects.create_user(username='runner', email='runner@example.com', password='pass12345')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_query(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/favorites/').status_code, 200)  # token + load bitmap favorit
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/favorites/').status_code, 200)
+
+    def test_cached_user_is_a_fresh_instance(self):
+        first, _ = authentication.get_token_user(self.token.key)
+        first.username = 'changed'
+        second, token = authentication.get_token_user(self.token.key)
+        self.assertEqual(second.username, 'runner')
+        self.assertEqual(token.user_id, self.user.id)
+
+    def test_logout_revokes_immediately(self):
+        self.client.get('/api/favorites/')
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/favorites/').status_code, 401)
+
+    def test_invalid_tokens_write_nothing_to_shared_cache(self):
+        bad = APIClient()
+        for i in range(3):
+            bad.credentials(HTTP_AUTHORIZATION=f'Token bogus{i}')
+            self.assertEqual(bad.get('/api/favorites/').status_code, 401)
+        state = caches['state']
+        self.assertFalse([key for key in state._cache if 'token:bogus' in key])
+
+        # Token valid dapet versi, tapi umurnya terbatas
+        self.client.get('/api/favorites/')
+        key = state.make_key(versions.KEY_PREFIX + authentication.version_name(self.token.key))
+        self.assertIsNotNone(state._expire_info[key])
+
+    def test_user_change_is_picked_up(self):
+        self.client.get('/api/favorites/')
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.user.refresh_from_db()
+        self.user.save()  # lewat save() biar signal jalan, kayak reset password / admin
+        self.assertEqual(self.client.get('/api/favorites/').status_code, 401)
+
+
+# ============================================================================
+# Cek ketersediaan username/email (Bloom filter)
+# ============================================================================
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create_user(username='Runner', email='runner@example.com', password='pass12345')
+        availability.get_index()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = availability.BloomFilter(1000, 0.01)
+        items = [f'user-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_definite_miss_skips_query(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(availability.username_taken('someone-new'))
+            self.assertFalse(availability.email_taken('new@example.com'))
+        self.assertTrue(availability.username_taken('Runner'))
+        self.assertFalse(availability.username_taken('runner'))  # filter case-insensitive, query tetap exact
+        self.assertTrue(availability.email_taken('RUNNER@example.com', iexact=True))
+
+    def test_new_user_seen_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username='walker', email='walker@example.com', password='pass12345')
+        self.assertTrue(availability.username_taken('walker'))
+
+    def test_user_from_other_worker_is_added_incrementally(self):
+        User.objects.bulk_create([User(username='trail', email='trail@example.com')])  # tanpa signal
+        versions.bump_version(availability.USERS_VERSION)  # seolah dari worker lain
+        self.assertTrue(availability.username_taken('trail'))
+
+    def test_user_committed_out_of_id_order_is_not_skipped(self):
+        late, early = User.objects.bulk_create([
+            User(username='late', email='late@example.com'),
+            User(username='early', email='early@example.com'),
+        ])
+        # Worker ini udah catch-up sampai id `early`, sementara `late` (id lebih kecil)
+        # belum commit waktu itu
+        User.objects.filter(id=late.id).delete()
+        versions.bump_version(availability.USERS_VERSION)
+        self.assertTrue(availability.username_taken('early'))
+        User.objects.bulk_create([User(id=late.id, username='late', email='late@example.com')])
+        versions.bump_version(availability.USERS_VERSION)
+        self.assertTrue(availability.username_taken('late'))
+
+        count = availability.get_index().bloom.count
+        versions.bump_version(availability.USERS_VERSION)
+        availability.get_index()
+        self.assertEqual(availability.get_index().bloom.count, count)  # query ulang gak dobel hitung
+
+    def test_check_availability_endpoint(self):
+        res = self.client.get('/api/check-availability/', {'username': 'Runner', 'email': 'free@example.com'})
+        self.assertEqual(res.json(), {'username': False, 'email': True})
+        self.assertEqual(self.client.get('/api/check-availability/').status_code, 400)
+
+
+# ============================================================================
+# Antrian job (email Supabase Auth)
+# ============================================================================
+
+@override_settings(JOB_RETRY_BACKOFF=0)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.supabase = mock.Mock()
+        patcher = mock.patch.object(supabase_client, 'supabase', self.supabase)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_register_enqueues_and_returns_immediately(self):
+        self.supabase.auth.sign_up.return_value = mock.Mock(user=mock.Mock(identities=[{'id': 1}]))
+        res = self.client.post('/api/register/', {'username': 'runner', 'email': 'runner@example.com', 'password': 'pass12345'})
+        self.assertEqual(res.status_code, 202)
+        job = jobs.wait(res.json()['job_id'], timeout=5)
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertNotIn('pass12345', json.dumps(job))  # password gak ikut disimpan
+
+        django_cache.clear()  # status job di cache 'state', gak ikut kebuang sama cache biasa
+        status = self.client.get(f"/api/jobs/{res.json()['job_id']}/").json()
+        self.assertEqual(status['status'], 'succeeded')
+        self.assertEqual(self.client.get('/api/jobs/nope/').status_code, 404)
+
+    def test_retries_transient_errors(self):
+        self.supabase.auth.resend.side_effect = [httpx.ConnectTimeout('slow'), httpx.ConnectTimeout('slow'), None]
+        job_id = self.client.post('/api/resend-otp/', {'email': 'runner@example.com'}).json()['job_id']
+        job = jobs.wait(job_id, timeout=5)
+        self.assertEqual((job['status'], job['attempts']), ('succeeded', 3))
+
+    def test_permanent_failure_is_not_retried(self):
+        self.supabase.auth.sign_up.return_value = mock.Mock(user=mock.Mock(identities=[]))
+        job_id = self.client.post('/api/register/', {'username': 'runner', 'email': 'runner@example.com', 'password': 'x'}).json()['job_id']
+        job = jobs.wait(job_id, timeout=5)
+        self.assertEqual((job['status'], job['attempts']), ('failed', 1))
+        self.assertEqual(job['error'], 'Email ini sudah terdaftar di sistem OTP.')
+
+    def test_idempotency_key_returns_same_job(self):
+        self.supabase.auth.resend.return_value = None
+        first = self.client.post('/api/resend-otp/', {'email': 'runner@example.com'}, HTTP_IDEMPOTENCY_KEY='abc').json()['job_id']
+        second = self.client.post('/api/resend-otp/', {'email': 'runner@example.com'}, HTTP_IDEMPOTENCY_KEY='abc').json()['job_id']
+        self.assertEqual(first, second)
+        jobs.wait(first, timeout=5)
+        self.assertEqual(self.supabase.auth.resend.call_count, 1)
+
+    def test_idempotency_key_is_scoped_to_email_and_payload(self):
+        self.supabase.auth.resend.return_value = None
+        first = self.client.post('/api/resend-otp/', {'email': 'runner@example.com'}, HTTP_IDEMPOTENCY_KEY='abc')
+        other = self.client.post('/api/resend-otp/', {'email': 'walker@example.com'}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertNotEqual(first.json()['job_id'], other.json()['job_id'])
+
+        self.supabase.auth.sign_up.return_value = mock.Mock(user=mock.Mock(identities=[{'id': 1}]))
+        data = {'username': 'runner', 'email': 'runner@example.com', 'password': 'pass12345'}
+        self.assertEqual(self.client.post('/api/register/', data, HTTP_IDEMPOTENCY_KEY='abc').status_code, 202)
+        res = self.client.post('/api/register/', {**data, 'password': 'other-pass'}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(res.status_code, 409)
+
+    def test_resubmit_without_key_with_new_payload_is_not_dropped(self):
+        self.supabase.auth.sign_up.return_value = mock.Mock(user=mock.Mock(identities=[{'id': 1}]))
+        data = {'username': 'runner', 'email': 'runner@example.com', 'password': 'typo'}
+        first = self.client.post('/api/register/', data).json()['job_id']
+        self.assertEqual(self.client.post('/api/register/', data).json()['job_id'], first)  # klik dobel
+        second = self.client.post('/api/register/', {**data, 'password': 'pass12345'}).json()['job_id']
+        self.assertNotEqual(first, second)
+        jobs.wait(first, timeout=5)
+        jobs.wait(second, timeout=5)
+        passwords = [call.args[0]['password'] for call in self.supabase.auth.sign_up.call_args_list]
+        self.assertEqual(passwords, ['typo', 'pass12345'])
+
+
+# ============================================================================
+# Review batch (write-behind + import)
+# ============================================================================
+
+class ReviewBufferTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reviewer', email='reviewer@example.com', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cache = catalog.CatalogCache(loader=lambda: make_shoes(5), ttl=60)
+        patcher = mock.patch.object(catalog, 'catalog_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(review_buffer.flush)
+
+    def test_add_review_writes_immediately_by_default(self):
+        res = self.client.post('/api/add-review/', {'shoe_id': 'R001', 'rating': 4, 'text': 'Enak'})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(Review.objects.filter(shoe_id='R001').count(), 1)
+        self.assertEqual(ratings.get_rating('R001'), 4.0)
+
+    def test_add_review_validates(self):
+        self.assertEqual(self.client.post('/api/add-review/', {'shoe_id': 'R001', 'rating': 9, 'text': 'x'}).status_code, 400)
+        self.assertEqual(self.client.post('/api/add-review/', {'shoe_id': 'NOPE', 'rating': 5, 'text': 'x'}).status_code, 400)
+        self.assertFalse(Review.objects.exists())
+
+    @override_settings(REVIEW_FLUSH_INTERVAL=60, REVIEW_BATCH_SIZE=100)
+    def test_buffered_reviews_flush_as_one_batch(self):
+        for rating in (2, 5):  # user sama, sepatu sama -> yang terakhir yang disimpan
+            res = self.client.post('/api/add-review/', {'shoe_id': 'R001', 'rating': rating, 'text': 'Mantap'})
+            self.assertEqual(res.status_code, 202)
+        self.client.post('/api/add-review/', {'shoe_id': 'R002', 'rating': 3, 'text': 'Oke'})
+        self.assertFalse(Review.objects.exists())
+
+        # bulk insert + (create summary, lock, bulk update) summary + 4 savepoint
+        with self.assertNumQueries(8):
+            self.assertEqual(review_buffer.flush(), 2)
+        self.assertEqual(sorted(Review.objects.values_list('shoe_id', 'rating')), [('R001', 5), ('R002', 3)])
+        self.assertEqual(ratings.get_rating_map(['R001', 'R002']), {'R001': 5.0, 'R002': 3.0})
+
+    def test_record_reviews_matches_incremental_updates(self):
+        ratings.record_review('R001', 3)
+        ratings.record_reviews([('R001', 5), ('R001', 4), ('R002', 1)])
+        summary = ShoeRatingSummary.objects.get(shoe_id='R001')
+        self.assertEqual((summary.review_count, summary.rating_sum), (3, 12))
+        self.assertEqual(summary.histogram, {'1': 0, '2': 0, '3': 1, '4': 1, '5': 1})
+
+    def test_import_command_streams_csv_and_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'reviews.csv')
+            with open(csv_path, 'w', encoding='utf-8') as f:
+                f.write('user_id,shoe_id,rating,text\n')
+                f.write(f'{self.user.id},R001,5,Great\n')
+                f.write(f'{self.user.id},R002,0,Bad rating\n')
+                f.write(f'{self.user.id},R003,4,Nice\n')
+            jsonl_path = os.path.join(tmp, 'reviews.jsonl')
+            with open(jsonl_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'user_id': self.user.id, 'shoe_id': 'R001', 'rating': 1, 'text': 'Again'}) + '\n')
+                f.write('not json\n')
+                f.write(json.dumps({'user_id': self.user.id, 'shoe_id': 'R004', 'rating': 2, 'text': 'Meh'}) + '\n')
+
+            out, err = StringIO(), StringIO()
+            call_command('import_reviews', csv_path, '--batch-size', '1', stdout=out, stderr=err)
+            call_command('import_reviews', jsonl_path, stdout=out, stderr=err)
+
+        # R001 dari JSONL dilewati karena user ini udah review R001
+        self.assertEqual(sorted(Review.objects.values_list('shoe_id', 'rating')), [('R001', 5), ('R003', 4), ('R004', 2)])
+        self.assertEqual(ratings.get_rating('R001'), 5.0)
+        self.assertIn('line 3', err.getvalue())
+        self.assertIn('line 2', err.getvalue())
+
+
+# ============================================================================
+# Payload sepatu yang udah di-render
+# ============================================================================
+
+class ShoePayloadTests(TestCase):
+    def setUp(self):
+        create_shoes(3)
+        self.cache = catalog.CatalogCache(ttl=60)
+        patcher = mock.patch.object(catalog, 'catalog_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_payload_matches_serializer_output(self):
+        shoe = Shoe.objects.get(shoe_id='R001')
+        expected = dict(ShoeSerializer(shoe).data, mainImage=shoe.img_url, model=shoe.name, rating=0)
+        res = self.client.get('/api/shoes/id/R001/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(res.content), expected)
+
+    def test_static_part_is_rendered_once_per_snapshot(self):
+        snapshot = catalog.get_snapshot()
+        shoe = snapshot.by_id['R001']
+        with mock.patch.object(shoe_payloads, 'build_static', wraps=shoe_payloads.build_static) as build:
+            first = shoe_payloads.render(snapshot, shoe, {'rating': 4.5})
+            second = shoe_payloads.render(snapshot, shoe, {'rating': 3, 'isFavorite': True})
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(json.loads(first)['rating'], 4.5)
+        self.assertEqual(json.loads(second)['isFavorite'], True)
+
+        # Katalog berubah -> snapshot baru -> payload di-render ulang
+        Shoe.objects.filter(shoe_id='R001').update(name='Renamed')
+        self.cache.invalidate()
+        body = json.loads(shoe_payloads.render(catalog.get_snapshot(), catalog.get_snapshot().by_id['R001']))
+        self.assertEqual((body['name'], body['model']), ('Renamed', 'Renamed'))
+
+    def test_detail_merges_dynamic_fields(self):
+        user = User.objects.create_user(username='fan', email='fan@example.com', password='pass12345')
+        favorites.toggle(user.id, 'R002')
+        client = APIClient()
+        client.force_authenticate(user)
+        body = client.get('/api/shoes/alpha-runner-2/').json()
+        self.assertEqual((body['shoe_id'], body['model'], body['isFavorite']), ('R002', 'Alpha Runner 2', True))
+        self.assertEqual(body['reviews'], [])
+        self.assertEqual(client.get('/api/shoes/nope/').status_code, 404)
+
+
+# ============================================================================
+# Renderer JSON & kompresi response
+# ============================================================================
+
+class RenderAndCompressionTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        compression.clear_cache()
+        shoes = [dict(shoe, name=f'Alpha Runner {shoe["id"]} \u2028 sepatu lari', img_url='https://example.com/x.jpg') for shoe in make_shoes(40)]
+        self.cache = catalog.CatalogCache(loader=lambda: shoes, ttl=60)
+        patcher = mock.patch.object(catalog, 'catalog_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_orjson_renderer_matches_drf_output(self):
+        data = {
+            'name': 'Sepatu \u2028 "ringan" é',
+            'price': Decimal('1.5'),
+            'when': timezone.now(),
+            'scores': np.array([1, 2]),
+            'nested': [{'a': None, 'b': 1.25}],
+        }
+        expected = json.loads(JSONRenderer().render(dict(data, scores=[1, 2])))
+        rendered = ORJSONRenderer().render(data)
+        self.assertNotIn('\u2028'.encode(), rendered)
+        actual = json.loads(rendered)
+        # orjson nyimpen mikrodetik penuh, DRF motong jadi milidetik
+        self.assertEqual(actual.pop('when')[:23], expected.pop('when')[:23])
+        self.assertEqual(actual, expected)
+
+    def test_gzip_and_brotli_negotiation(self):
+        plain = self.client.get('/api/shoes/', {'limit': 40})
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        res = self.client.get('/api/shoes/', {'limit': 40}, HTTP_ACCEPT_ENCODING='gzip, br;q=0.5')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(res.content)), json.loads(plain.content))
+
+        res = self.client.get('/api/shoes/', {'limit': 40}, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(res['Content-Encoding'], 'br')
+        self.assertEqual(int(res['Content-Length']), len(res.content))
+        self.assertEqual(json.loads(compression.brotli.decompress(res.content)), json.loads(plain.content))
+        self.assertIsNone(compression.choose_encoding('identity, gzip;q=0'))
+
+    def test_small_responses_are_not_compressed(self):
+        res = self.client.get('/api/shoes/', {'limit': 1, 'fields': 'shoe_id'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', res)
+
+    def test_public_catalog_response_is_compressed_once(self):
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.client.get('/api/shoes/', {'limit': 40}, HTTP_ACCEPT_ENCODING='br')
+            second = self.client.get('/api/shoes/', {'limit': 40}, HTTP_ACCEPT_ENCODING='br')
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_private_responses_are_not_stored(self):
+        user = User.objects.create_user(username='fan', email='fan@example.com', password='pass12345')
+        client = APIClient()
+        client.force_authenticate(user)
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            for _ in range(2):
+                res = client.get('/api/shoes/alpha-runner-1/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn('private', res['Cache-Control'])
+        self.assertEqual(compress.call_count, 2)
+        self.assertEqual(json.loads(gzip.decompress(res.content))['shoe_id'], 'R001')
@@ -0,0 +1,26 @@
+"""
+Token login (DRF authtoken) dengan cache user_id -> key.
+
+Login yang kedua dst gak perlu Token.objects.get_or_create lagi. Cache-nya pakai
+cache Django bersama (settings.CACHES), jadi begitu token dihapus (logout, admin)
+semua worker langsung gak ngasih key lama lagi (lihat forget + api/signals.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+KEY_PREFIX = 'auth-token:'
+
+
+def get_or_create_key(user):
+    cache_key = f'{KEY_PREFIX}{user.id}'
+    key = cache.get(cache_key)
+    if key is None:
+        token, _ = Token.objects.get_or_create(user=user)
+        key = token.key
+        cache.set(cache_key, key, timeout=settings.TOKEN_CACHE_TTL)
+    return key
+
+
+def forget(user_id):
+    cache.delete(f'{KEY_PREFIX}{user_id}')
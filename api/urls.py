@@ -1,23 +1,35 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 # from .views import register_user, verify_otp, login_user, manage_profile
 
+# Search & detail bisa pakai versi async (lihat api/async_views.py)
+read_views = async_views if settings.ASYNC_READ_VIEWS else views
+
 urlpatterns = [
     path('register/', views.register_user, name='register'),
+    path('check-availability/', views.check_availability, name='check_availability'),
     path('verify-otp/', views.verify_otp, name='verify-otp'), 
     path('login/', views.login_user, name='login'),
     path('profile/', views.manage_profile, name='user-profile'),
     path('resend-otp/', views.resend_otp, name='resend_otp'),
+    path('jobs/<str:job_id>/', views.get_job_status, name='job_status'),
     path('forgot-password/', views.forgot_password, name='forgot_password'),
     path('reset-password/', views.reset_password_confirm, name='reset_password_confirm'),
     path('logout/', views.logout_user, name='logout'),
-    path('shoes/search/', views.search_shoes, name='search_shoes'),
+    path('shoes/search/', read_views.search_shoes, name='search_shoes'),
+    path('shoes/suggest/', views.suggest_shoes, name='suggest_shoes'),
+    path('shoes/filter/', views.filter_shoes, name='filter_shoes'),
     path('favorites/toggle/', views.toggle_favorite, name='toggle_favorite'),
+    path('favorites/bulk/', views.bulk_favorites, name='bulk_favorites'),
     path('favorites/', views.get_user_favorites, name='get_user_favorites'),
-    path('shoes/<slug:slug>/', views.get_shoe_detail, name='shoe-detail'),
+    path('shoes/<slug:slug>/', read_views.get_shoe_detail, name='shoe-detail'),
+    path('shoes/<slug:slug>/reviews/', views.get_shoe_reviews, name='shoe-reviews'),
     path('add-review/', views.add_review, name='add_review'),
     path('shoes/', views.get_all_shoes, name='get_all_shoes'),
     path('user-profile/', views.manage_profile, name='user-profile'),
     path('shoes/id/<str:id>/', views.get_shoe_by_id, name='get_shoe_by_id'),
+    path('recommendations/', views.get_recommendations, name='get_recommendations'),
+    path('admin/supabase-stats/', views.supabase_stats, name='supabase_stats'),
 
 ]
\ No newline at end of file
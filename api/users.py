@@ -0,0 +1,46 @@
+"""
+Resolve user_id -> username secara bulk.
+
+Dipakai waktu nampilin review: semua id reviewer di-resolve sekaligus (maksimal
+satu query untuk id yang belum ada di cache), bukan satu User.objects.get per review.
+Hasilnya disimpan di LRU kecil yang dipakai bareng semua request di worker ini.
+"""
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+
+from .models import User
+
+_usernames = TTLCache(maxsize=settings.USERNAME_CACHE_SIZE, ttl=settings.USERNAME_CACHE_TTL)
+_lock = threading.Lock()
+
+
+def resolve_usernames(user_ids):
+    """Return map id -> username. Id yang usernya gak ada tidak masuk map."""
+    user_ids = set(user_ids)
+    found, missing = {}, []
+    with _lock:
+        for user_id in user_ids:
+            username = _usernames.get(user_id)
+            if username is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = username
+
+    if missing:
+        rows = dict(User.objects.filter(id__in=missing).values_list('id', 'username'))
+        with _lock:
+            _usernames.update(rows)
+        found.update(rows)
+    return found
+
+
+def display_name(usernames, user_id):
+    return usernames.get(user_id) or f"User {user_id}"
+
+
+def forget(user_id):
+    """Buang dari cache (misal username diganti)."""
+    with _lock:
+        _usernames.pop(user_id, None)
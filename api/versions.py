@@ -0,0 +1,63 @@
+"""
+Nomor versi (generation) bersama untuk data yang di-cache di memori worker.
+
+Disimpan di cache Django alias 'state' (settings.CACHES), jadi kalau satu proses
+(worker lain, management command, admin) bikin perubahan, worker lain bisa tahu
+cache lokalnya sudah basi cukup dengan membandingkan angka ini, tanpa query ke
+database.
+
+Cuma boleh dibandingkan sama-dengan / beda. Di file cache, incr itu get lalu set
+(gak atomic), jadi dua bump barengan bisa ngasih angka yang sama.
+"""
+import time
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+# Proxy (kayak django.core.cache.cache), jadi ikut kalau CACHES di-override (misal waktu test)
+cache = ConnectionProxy(caches, 'state')
+
+KEY_PREFIX = 'version:'
+
+
+def _seed(key, timeout=None):
+    # Key belum ada (atau kena evict) -> mulai dari timestamp biar gak bentrok
+    # sama angka lama yang masih dipegang worker lain
+    cache.add(key, int(time.time() * 1000), timeout=timeout)
+    return cache.get(key, 0)
+
+
+def get_version(name):
+    key = KEY_PREFIX + name
+    version = cache.get(key)
+    return _seed(key) if version is None else version
+
+
+def get_versions(*names):
+    keys = [KEY_PREFIX + name for name in names]
+    found = cache.get_many(keys)
+    return {name: found[key] if key in found else _seed(key) for name, key in zip(names, keys)}
+
+
+def peek_version(name):
+    """Versi sekarang tanpa nulis apa-apa: None kalau key-nya belum ada."""
+    return cache.get(KEY_PREFIX + name)
+
+
+def create_version(name, timeout=None):
+    """
+    Seed versi baru. Return versinya kalau key ini yang bikin, None kalau key-nya
+    ternyata udah ada (misal keburu di-bump proses lain).
+    """
+    version = int(time.time() * 1000)
+    return version if cache.add(KEY_PREFIX + name, version, timeout=timeout) else None
+
+
+def bump_version(name, timeout=None):
+    """Naikkan versi (+1), return versi baru. timeout cuma dipakai kalau key-nya belum ada."""
+    key = KEY_PREFIX + name
+    try:
+        return cache.incr(key)
+    except ValueError:
+        _seed(key, timeout)
+        return cache.incr(key)
@@ -1,22 +1,57 @@
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated 
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated 
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token 
 from django.contrib.auth.models import update_last_login # PENTING: Untuk update jam login
-from django.contrib.auth import authenticate
-from .supabase_client import supabase
+from django.db import IntegrityError
+from django.db.models import Case, Q, Value, When
+from django.http import HttpResponse, StreamingHttpResponse
+from .supabase_client import supabase, get_stats as get_supabase_stats
 # Import model User custom kita dan model lainnya
-from .models import User, UserProfile, Shoe, Review, Favorite
-from .serializers import UserProfileSerializer, ShoeSerializer, UserDetailSerializer    
+from .models import User, UserProfile, Shoe
+from .serializers import UserProfileSerializer, UserDetailSerializer    
+from . import auth_tasks, availability, catalog, facets, favorites, jobs, last_login, pagination, ratings, recommend, review_buffer, reviews, search, shoe_payloads, similar, tokens
+from .conditional import conditional_catalog
 
 import traceback
 
+# Response kalau Supabase Auth gak bisa dihubungi / lagi down (error di jobs.RETRYABLE)
+AUTH_UNAVAILABLE = {'error': 'Auth service is temporarily unavailable. Please try again later.'}
+
+# Batas jumlah perubahan di bulk_favorites
+MAX_BULK_FAVORITES = 500
+
+# Kolom yang boleh diminta lewat ?fields= di list katalog
+SHOE_LIST_FIELDS = {field.name for field in Shoe._meta.fields} | {'rating'}
+
 
 # ============================================================================
 # BAGIAN A: AUTHENTICATION (REGISTER, LOGIN, OTP)
 # ============================================================================
 
+def _enqueue_auth_job(request, message, task_name, email, *args):
+    """
+    Enqueue job Supabase Auth, balas 202 + job_id.
+
+    Idempotency key-nya selalu per email (key dari client gak bisa nabrak email lain).
+    Header Idempotency-Key yang dipakai ulang dengan data beda -> 409. Tanpa header,
+    kirim ulang dengan data yang sama dianggap klik dobel, tapi kalau datanya beda
+    (misal password dibenerin) jadi job baru.
+    """
+    email_key = email.strip().lower()
+    client_key = request.headers.get('Idempotency-Key')
+    try:
+        job_id = jobs.enqueue(
+            task_name, email, *args,
+            idempotency_key=f'{email_key}:{client_key}' if client_key else email_key,
+            replace_on_conflict=not client_key,
+        )
+    except jobs.IdempotencyConflict as e:
+        return Response({'error': str(e)}, status=409)
+    return Response({'message': message, 'job_id': job_id}, status=202)
+
+
 # --- 1. REGISTER (Minta OTP ke Supabase) ---
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -35,27 +70,35 @@ def register_user(request):
         
     # B. Cek apakah Username ATAU Email sudah ada di Django (PENTING!)
     # Kita cek dulu di DB kita biar gak bentrok nanti pas verify
-    if User.objects.filter(username=username).exists():
+    # (Bloom filter dulu, query cuma kalau "mungkin ada", lihat api/availability.py)
+    if availability.username_taken(username):
         return Response({'error': 'Username ini sudah terpakai.'}, status=400)
     
-    if User.objects.filter(email=email).exists():
+    if availability.email_taken(email):
         return Response({'error': 'Email ini sudah terdaftar.'}, status=400)
 
-    try:
-        # C. Minta Supabase kirim OTP (Sign Up)
-        res = supabase.auth.sign_up({
-            "email": email,
-            "password": password, 
-        })
+    # C. Minta Supabase kirim OTP (Sign Up) -> lewat antrian job, gak nunggu email terkirim
+    # Hasilnya dicek lewat GET /api/jobs/<job_id>/ (lihat api/jobs.py)
+    return _enqueue_auth_job(request, 'Kode OTP sedang dikirim ke email!', 'send_signup_otp', email, password)
 
-        # Cek jika email sudah terdaftar di sistem OTP Supabase tapi belum verified
-        if res.user and getattr(res.user, 'identities', []) == []:
-             return Response({'error': 'Email ini sudah terdaftar di sistem OTP.'}, status=400)
 
-        return Response({'message': 'Kode OTP telah dikirim ke email!'}, status=201)
+# --- 1b. CEK KETERSEDIAAN (Validasi live di form register) ---
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def check_availability(request):
+    """?username=...&email=... -> {'username': true/false, 'email': true/false} (true = masih bisa dipakai)"""
+    username = request.GET.get('username', '').strip()
+    email = request.GET.get('email', '').strip()
+    if not username and not email:
+        return Response({'error': 'Provide a username or email to check.'}, status=400)
 
-    except Exception as e:
-        return Response({'error': str(e)}, status=400)
+    result = {}
+    if username:
+        result['username'] = not availability.username_taken(username)
+    if email:
+        result['email'] = not availability.email_taken(email)
+    return Response(result, status=200)
 
 
 # --- 2. VERIFY OTP (Simpan User ke Django) ---
@@ -83,11 +126,11 @@ def verify_otp(request):
         })
 
         # B. Validasi Terakhir (Takutnya username diambil orang lain pas lagi nunggu OTP)
-        if User.objects.filter(username=username).exists():
+        if availability.username_taken(username):
             return Response({'error': 'Username sudah diambil orang lain.'}, status=400)
 
         # C. SIMPAN USER KE DATABASE DJANGO (FINAL)
-        if not User.objects.filter(email=email).exists():
+        if not availability.email_taken(email):
             # create_user otomatis mengenkripsi password (hashing)
             user = User.objects.create_user(
                 username=username, 
@@ -102,6 +145,12 @@ def verify_otp(request):
         else:
             return Response({'error': 'User sudah ada di database.'}, status=400)
 
+    except IntegrityError:
+        # Keduluan request lain yang bikin user yang sama
+        return Response({'error': 'User sudah ada di database.'}, status=400)
+    except jobs.RETRYABLE:
+        # Timeout, Supabase lagi down (circuit breaker kebuka) atau balas 502/503/504 -> gagal cepat
+        return Response(AUTH_UNAVAILABLE, status=503)
     except Exception as e:
         return Response({'error': 'Kode OTP salah atau sudah kadaluarsa.'}, status=400)
 
@@ -120,33 +169,37 @@ def login_user(request):
     if not input_ident or not password:  
         return Response({'error': 'Mohon isi username/email dan password.'}, status=400)
 
-    # A. Logika Cek Email vs Username
-    # Kita harus cari tahu 'username' aslinya apa buat dikasih ke fungsi authenticate Django
-    username_to_auth = input_ident
-    if '@' in input_ident:
-        try:
-            user_obj = User.objects.get(email=input_ident)
-            username_to_auth = user_obj.username
-        except User.DoesNotExist:
-            pass # Biarkan lanjut biar ditolak di bawah (keamanan)
-    
-    # B. Autentikasi User
-    user = authenticate(username=username_to_auth, password=password)
+    # A. Cari user-nya pakai email ATAU username, sekali query (profile ikut di-join).
+    # Username juga boleh ada '@'-nya, jadi dua-duanya dicek; kalau ada dua user yang
+    # cocok, yang email-nya sama didahulukan (sama kayak alur lama: email dulu, baru username)
+    user = (
+        User.objects.select_related('profile')
+        .filter(Q(email=input_ident) | Q(username=input_ident))
+        .order_by(Case(When(email=input_ident, then=Value(0)), default=Value(1)))
+        .first()
+    )
+
+    # B. Cek Password
+    if user is None:
+        # Tetap hashing sekali biar waktu respons "user gak ada" sama kayak "password salah"
+        User().set_password(password)
+    elif not user.check_password(password):
+        user = None
 
     if user is not None:
         if not user.is_active:
              return Response({'error': 'Akun ini sedang dinonaktifkan.'}, status=401)
 
-        # FIX: Update kolom last_login di Supabase (biar gak Null)
-        update_last_login(None, user)
+        # Update kolom last_login (ditulis batch di background, lihat api/last_login.py)
+        last_login.record(user.id)
 
-        # C. Generate Token Login
-        token, created = Token.objects.get_or_create(user=user)
+        # C. Generate Token Login (key-nya di-cache, lihat api/tokens.py)
+        token_key = tokens.get_or_create_key(user)
         has_profile = hasattr(user, 'profile')
 
         return Response({
             'message': 'Login berhasil!',
-            'token': token.key, 
+            'token': token_key, 
             'email': user.email, 
             'username': user.username,
             'user_id': user.id, # Sekarang ini isinya ANGKA (1, 2, 3...)
@@ -157,6 +210,17 @@ def login_user(request):
         return Response({'error': 'Username/Email atau Password salah.'}, status=401)
 
 
+# --- 3b. STATUS JOB (OTP / reset password yang dikirim di background) ---
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def get_job_status(request, job_id):
+    job = jobs.get_status(job_id)
+    if job is None:
+        return Response({'error': 'Job not found.'}, status=404)
+    return Response(job, status=200)
+
+
 # ============================================================================
 # BAGIAN B: USER PROFILE
 # ============================================================================
@@ -216,12 +280,9 @@ def manage_profile(request):
 @permission_classes([AllowAny])
 def resend_otp(request):
     email = request.data.get('email')
+    if not email: return Response({'error': 'Please enter your email address.'}, status=400)
 
-    try:
-        supabase.auth.resend({"type": "signup", "email": email})
-        return Response({'message': 'OTP resent successfully!'}, status=200)
-    except Exception as e:
-        return Response({'error': str(e)}, status=400)
+    return _enqueue_auth_job(request, 'OTP is being resent.', 'resend_signup_otp', email)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -229,28 +290,25 @@ def forgot_password(request):
     email = request.data.get('email')
     if not email: return Response({'error': 'Please enter your email address.'}, status=400)
     
-    if not User.objects.filter(email__iexact=email).exists():
+    if not availability.email_taken(email, iexact=True):
         return Response({
             'error': 'We couldn\'t find that email. Would you like to sign up?'
         }, status=404)
         
-    try:
-        # 1. Tangkap asal domain dari request header (contoh: https://sonix-rush.vercel.app)
-        origin = request.META.get('HTTP_ORIGIN')
-        
-        # 2. Kasih default fallback (misal kalau di-test via Postman yang nggak ada origin-nya)
-        if not origin:
-            origin = 'https://sonix-rush.vercel.app'
-            
-        # 3. Buat URL dinamis!
-        redirect_url = f'{origin}/update-password'
-        
-        # 4. Kirim ke Supabase
-        supabase.auth.reset_password_email(email, options={'redirect_to': redirect_url})
-        
-        return Response({'message': 'Link reset password has been sent to your email.'})
-    except Exception as e:
-        return Response({'error': str(e)}, status=400)
+    # 1. Tangkap asal domain dari request header (contoh: https://sonix-rush.vercel.app)
+    origin = request.META.get('HTTP_ORIGIN')
+
+    # 2. Kasih default fallback (misal kalau di-test via Postman yang nggak ada origin-nya)
+    if not origin:
+        origin = 'https://sonix-rush.vercel.app'
+
+    # 3. Buat URL dinamis!
+    redirect_url = f'{origin}/update-password'
+
+    # 4. Kirim ke Supabase (lewat antrian job)
+    return _enqueue_auth_job(
+        request, 'Link reset password is being sent to your email.', 'send_password_reset', email, redirect_url,
+    )
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -273,6 +331,8 @@ def reset_password_confirm(request):
         except User.DoesNotExist:
             pass
         return Response({'message': 'All set! Your password has been updated.'})
+    except jobs.RETRYABLE:
+        return Response(AUTH_UNAVAILABLE, status=503)
     except Exception as e:
         return Response({'error': str(e)}, status=400)
 
@@ -298,31 +358,29 @@ def search_shoes(request):
     query = request.GET.get('q', '')
     if not query: return Response([])
     try:
-        # A. Cari di Supabase
-        res = supabase.table('shoes').select('*').or_(f"name.ilike.%{query}%,brand.ilike.%{query}%").execute()
-        shoes_data = res.data
+        # A. Cari pakai index lokal (urut relevansi, tahan typo & prefix)
+        shoes_data = search.search(catalog.get_snapshot(), query)
         
-        # B. Cek Favorit User (Kalau login)
-        user_favorites = []
+        # B. Cek Favorit User (Kalau login) -> irisan bitmap, gak query per request
+        user_favorites = set()
         if request.user.is_authenticated:
             try:
-                # user.id sekarang adalah INTEGER (misal: 1, 2, 5)
-                fav_res = supabase.table('favorites').select('shoe_id').eq('user_id', request.user.id).execute()
-                user_favorites = [item['shoe_id'] for item in fav_res.data]
+                user_favorites = favorites.favorite_ids(request.user.id, [shoe['shoe_id'] for shoe in shoes_data])
             except Exception: pass
 
+        # C. Hitung Rating Rata-rata (SATU query buat semua hasil, bukan per sepatu)
+        try:
+            rating_map = ratings.get_rating_map([shoe.get('shoe_id') for shoe in shoes_data])
+        except Exception: rating_map = {}
+
         final_results = []
         for shoe in shoes_data:
             s_id = shoe.get('shoe_id')
-            
-            # C. Hitung Rating Rata-rata
-            try:
-                rev_res = supabase.table('reviews').select('rating').eq('shoe_id', s_id).execute()
-                avg_rating = round(sum(r['rating'] for r in rev_res.data) / len(rev_res.data), 1) if rev_res.data else 0
-            except: avg_rating = 0
+            avg_rating = rating_map.get(s_id, 0)
 
             final_results.append({
-                'id': shoe.get('id'), # ID unik sepatu
+                # Model Shoe gak punya kolom id (PK-nya shoe_id), key lama dipertahankan buat frontend
+                'id': s_id,
                 'shoe_id': s_id,      # ID string sepatu (misal 'nike-pegasus')
                 'name': shoe.get('name'),
                 'brand': shoe.get('brand'),
@@ -335,63 +393,125 @@ def search_shoes(request):
     except Exception as e:
         return Response({'error': 'Search failed. Try again later.'}, status=500)
 
+# --- 1b. SUGGEST (Autocomplete buat search bar) ---
+@api_view(['GET'])
+@authentication_classes([])  # Hasilnya sama buat semua user, skip cek token
+@permission_classes([AllowAny])
+def suggest_shoes(request):
+    prefix = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    try:
+        return Response(search.suggest(catalog.get_snapshot(), prefix, limit=limit), status=200)
+    except Exception:
+        return Response({'error': 'Suggestion failed. Try again later.'}, status=500)
+
+# --- 1c. FILTER SHOES (Filter + facet count + sort di server) ---
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def filter_shoes(request):
+    try:
+        selected, ranges, sort = facets.parse_params(request.GET)
+        limit = min(max(int(request.GET.get('limit', 24)), 1), 100)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+
+    try:
+        # A. Operasi bitmap per facet (lihat api/facets.py)
+        index = facets.get_index(catalog.get_snapshot())
+        matched, facet_counts = index.apply(selected, ranges)
+
+        # B. Rating cuma diambil kalau butuh buat sort, sisanya untuk 1 halaman aja
+        rating_map = ratings.get_rating_map() if sort and sort.lstrip('-') == 'rating' else None
+        positions = facets.sort_positions(index, matched, sort, rating_map or {})[offset:offset + limit]
+        page = [index.shoes[i] for i in positions]
+        if rating_map is None:
+            rating_map = ratings.get_rating_map([shoe['shoe_id'] for shoe in page])
+
+        return Response({
+            'count': len(matched),
+            'facets': facet_counts,
+            'results': [dict(shoe, rating=rating_map.get(shoe['shoe_id'], 0)) for shoe in page],
+        }, status=200)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
 # --- 2. GET SHOE DETAIL (Lengkap dengan Review) ---
 @api_view(['GET'])
 @permission_classes([AllowAny]) 
+@conditional_catalog(per_user=True)
 def get_shoe_detail(request, slug):
-    try:
-        # A. Ambil Data Sepatu dari Django
-        shoe = Shoe.objects.get(slug=slug)
-        serializer = ShoeSerializer(shoe)
-        response_data = serializer.data
-        
-        # Tambahan field manual
-        response_data['mainImage'] = shoe.img_url
-        response_data['model'] = shoe.name
-        
-        # B. Cek Status Favorit
-        response_data['isFavorite'] = False 
-        if request.user.is_authenticated:
-            try:
-                cek_fav = supabase.table('favorites').select('*').eq('user_id', request.user.id).eq('shoe_id', shoe.shoe_id).execute()
-                if len(cek_fav.data) > 0: response_data['isFavorite'] = True
-            except: pass
-        
-        # C. Ambil Reviews dari Supabase & Map ke Username
+    # A. Ambil Data Sepatu dari snapshot katalog (bagian statisnya udah di-render, lihat api/shoe_payloads.py)
+    snapshot = catalog.get_snapshot()
+    shoe = snapshot.by_slug.get(slug)
+    if shoe is None:
+        return Response({'error': 'No shoes found.'}, status=404)
+    shoe_id = shoe['shoe_id']
+    response_data = {}
+
+    # B. Cek Status Favorit
+    response_data['isFavorite'] = False 
+    if request.user.is_authenticated:
         try:
-            reviews_db = supabase.table('reviews').select('*').eq('shoe_id', shoe.shoe_id).order('created_at', desc=True).execute()
-            formatted_reviews = []
-            total_rating = 0
-            
-            for rv in reviews_db.data:
-                user_id_reviewer = rv.get('user_id') # Ini Angka (misal: 5)
-                try:
-                    # Cari username di Django berdasarkan ID Integer
-                    user_obj = User.objects.get(id=user_id_reviewer) 
-                    display_name = user_obj.username
-                except User.DoesNotExist:
-                    display_name = f"User {user_id_reviewer}"
-                
-                total_rating += rv.get('rating', 0)
-                formatted_reviews.append({
-                    'id': rv.get('id'),
-                    'user': display_name, 
-                    'avatar': f"https://api.dicebear.com/7.x/avataaars/svg?seed={display_name}", 
-                    'date': rv.get('created_at', '')[:10],
-                    'text': rv.get('review_text', ''),
-                    'rating': rv.get('rating', 0)
-                })
-            
-            response_data['reviews'] = formatted_reviews
-            response_data['rating'] = round(total_rating / len(reviews_db.data), 1) if reviews_db.data else 0
-        except: 
-            response_data['reviews'] = []
-            response_data['rating'] = 0
-
-        return Response(response_data, status=200)
-    except Shoe.DoesNotExist:
+            response_data['isFavorite'] = favorites.is_favorite(request.user.id, shoe_id)
+        except: pass
+    
+    # C. Ringkasan Rating + HALAMAN PERTAMA review aja (sisanya lewat /shoes/<slug>/reviews/)
+    try:
+        summary = ratings.get_summaries([shoe_id]).get(shoe_id)
+        response_data['rating'] = summary.average if summary else 0
+        response_data['rating_summary'] = {
+            'count': summary.review_count if summary else 0,
+            'histogram': summary.histogram if summary else {str(star): 0 for star in ratings.STARS},
+        }
+        response_data['reviews'], response_data['reviews_next_cursor'] = reviews.get_page(shoe_id)
+    except: 
+        response_data['reviews'] = []
+        response_data['reviews_next_cursor'] = None
+        response_data['rating'] = 0
+
+    # D. Sepatu Serupa (lookup tabel tetangga yang udah dihitung per katalog)
+    try:
+        response_data['similar'] = [{
+            'shoe_id': similar_shoe['shoe_id'],
+            'name': similar_shoe.get('name'),
+            'brand': similar_shoe.get('brand'),
+            'img_url': similar_shoe.get('img_url'),
+            'slug': similar_shoe.get('slug'),
+        } for similar_shoe in similar.similar_to(snapshot, shoe_id)]
+    except Exception:
+        response_data['similar'] = []
+
+    return HttpResponse(shoe_payloads.render(snapshot, shoe, response_data), content_type='application/json')
+
+
+# --- 3. LIST REVIEW SEPATU (Per halaman / export NDJSON) ---
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_shoe_reviews(request, slug):
+    """
+    ?cursor=<reviews_next_cursor>&limit=10  -> satu halaman review
+    ?export=ndjson                           -> semua review, di-stream per baris
+    """
+    shoe = catalog.get_snapshot().by_slug.get(slug)
+    if shoe is None:
         return Response({'error': 'No shoes found.'}, status=404)
 
+    if request.GET.get('export') == 'ndjson':
+        response = StreamingHttpResponse(reviews.iter_ndjson(shoe['shoe_id']), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{slug}-reviews.ndjson"'
+        return response
+
+    try:
+        limit = pagination.parse_limit(request.GET.get('limit'), reviews.DEFAULT_PAGE_SIZE, reviews.MAX_PAGE_SIZE)
+        results, next_cursor = reviews.get_page(shoe['shoe_id'], request.GET.get('cursor'), limit)
+    except (pagination.PaginationError, reviews.CursorError) as e:
+        return Response({'error': str(e)}, status=400)
+    return Response({'results': results, 'next_cursor': next_cursor}, status=200)
+
 
 # ============================================================================
 # BAGIAN E: INTERAKSI USER (Favorite, Add Review)
@@ -405,60 +525,82 @@ def toggle_favorite(request):
     
     if not shoe_id: 
         return Response({'error': 'shoe_id wajib diisi.'}, status=400)
+    if not isinstance(shoe_id, str) or shoe_id not in catalog.get_snapshot().by_id:
+        return Response({'error': f'Sepatu {shoe_id} tidak ditemukan.'}, status=400)
+
+    # Opsional: kirim 'is_favorite' true/false biar idempotent (aman kalau ke-tap dua kali)
+    desired = request.data.get('is_favorite')
 
     try:
-        # Cek apakah sudah ada di favorit menggunakan Django ORM
-        favorite_obj = Favorite.objects.filter(user=user, shoe_id=shoe_id).first()
-        
-        if favorite_obj:
-            # Kalau ada, HAPUS
-            favorite_obj.delete()
-            return Response({'message': 'Dihapus dari favorit', 'is_favorite': False}, status=200)
+        if desired is None:
+            # Toggle atomic dalam satu statement (lihat api/favorites.py)
+            is_favorite = favorites.toggle(user.id, shoe_id)
         else:
-            # Kalau tidak ada, TAMBAH
-            Favorite.objects.create(user=user, shoe_id=shoe_id)
+            is_favorite = str(desired).lower() in ('true', '1')
+            if is_favorite:
+                favorites.apply_changes(user.id, added=[shoe_id])
+            else:
+                favorites.apply_changes(user.id, removed=[shoe_id])
+
+        if is_favorite:
             return Response({'message': 'Ditambahkan ke favorit', 'is_favorite': True}, status=201)
+        return Response({'message': 'Dihapus dari favorit', 'is_favorite': False}, status=200)
             
     except Exception as e:
         print("ERROR ASLI FAVORITE:", str(e))
         return Response({'error': f'Gagal update database: {str(e)}'}, status=500)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_favorites(request):
+    """
+    Sinkron favorit dari client offline dalam satu request.
+    Body: {"add": ["R001", ...], "remove": ["R002", ...]}
+    """
+    added = request.data.get('add') or []
+    removed = request.data.get('remove') or []
+
+    if not isinstance(added, list) or not isinstance(removed, list):
+        return Response({'error': "'add' dan 'remove' harus berupa list shoe_id."}, status=400)
+    if len(added) + len(removed) > MAX_BULK_FAVORITES:
+        return Response({'error': f'Maksimal {MAX_BULK_FAVORITES} perubahan per request.'}, status=400)
+    if not all(isinstance(shoe_id, str) for shoe_id in added + removed):
+        return Response({'error': "'add' dan 'remove' harus berupa list shoe_id."}, status=400)
+    # Yang ditambah wajib ada di katalog. Yang dihapus boleh sepatu yang udah gak ada
+    # (biar client offline tetap bisa bersihin favorit lamanya).
+    known_shoe_ids = catalog.get_snapshot().by_id
+    unknown = [shoe_id for shoe_id in added if shoe_id not in known_shoe_ids]
+    if unknown:
+        return Response({'error': f"Sepatu tidak ditemukan: {', '.join(unknown[:10])}"}, status=400)
+    if set(added) & set(removed):
+        return Response({'error': 'shoe_id yang sama tidak boleh ada di add dan remove.'}, status=400)
+
+    try:
+        favorites.apply_changes(request.user.id, added=added, removed=removed)
+        return Response({'favorites': sorted(favorites.favorite_ids(request.user.id))}, status=200)
+    except Exception as e:
+        print("ERROR ASLI BULK FAVORITE:", str(e))
+        return Response({'error': f'Gagal update database: {str(e)}'}, status=500)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_favorites(request):
     user_id = request.user.id
     try:
-        # 1. Ambil list ID sepatu favorit user
-        fav_res = supabase.table('favorites').select('shoe_id').eq('user_id', user_id).execute()
-        shoe_ids = [item['shoe_id'] for item in fav_res.data]
+        # 1. Ambil list ID sepatu favorit user (dari cache bitmap)
+        shoe_ids = sorted(favorites.favorite_ids(user_id))
         
         if not shoe_ids: return Response([], status=200)
         
-        # 2. Ambil detail sepatu mentah dari Supabase berdasarkan list ID tadi
-        shoes_res = supabase.table('shoes').select('*').in_('shoe_id', shoe_ids).execute()
-        shoes_data = shoes_res.data
+        # 2. Ambil detail sepatu dari katalog yang udah di-cache
+        snapshot = catalog.get_snapshot()
+        shoe_rows = [snapshot.by_id[s_id] for s_id in shoe_ids if s_id in snapshot.by_id]
         
-        # 3. Ambil Rating KHUSUS untuk sepatu-sepatu ini saja
-        # Syntax .in_() butuh tuple/list
-        reviews_res = supabase.table('reviews').select('shoe_id, rating').in_('shoe_id', shoe_ids).execute()
-        reviews = reviews_res.data if reviews_res.data else []
-
-        # 4. Grouping Rating (Dictionary Map)
-        rating_map = {}
-        for r in reviews:
-            s_id = r['shoe_id']
-            if s_id not in rating_map: rating_map[s_id] = []
-            rating_map[s_id].append(r['rating'])
-
-        # 5. Tempel Rating
-        for shoe in shoes_data:
-            s_id = shoe.get('shoe_id')
-            if s_id in rating_map:
-                ratings = rating_map[s_id]
-                avg = sum(ratings) / len(ratings)
-                shoe['rating'] = round(avg, 1)
-            else:
-                shoe['rating'] = 0
+        # 3. Ambil Rating KHUSUS untuk sepatu-sepatu ini saja (satu query)
+        rating_map = ratings.get_rating_map(shoe_ids)
+
+        # 4. Tempel Rating (copy dulu, baris katalog dipakai bareng semua request)
+        shoes_data = [dict(shoe, rating=rating_map.get(shoe['shoe_id'], 0)) for shoe in shoe_rows]
 
         return Response(shoes_data, status=200)
 
@@ -469,85 +611,133 @@ def get_user_favorites(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def add_review(request):
-    user_id = request.user.id
-    shoe_id = request.data.get('shoe_id')
-    rating = request.data.get('rating')
-    text = request.data.get('text')
-
-    if not shoe_id or not rating or not text:
-        return Response({'error': 'Data review tidak lengkap.'}, status=400)
-        
     try:
-        # Gunakan Django ORM! Jauh lebih aman, anti-mabuk memori, dan tembus RLS otomatis.
-        Review.objects.create(
-            shoe_id=shoe_id,
-            user_id=user_id,
-            rating=int(rating),
-            review_text=text
+        review = review_buffer.validate(
+            request.user.id,
+            request.data.get('shoe_id'),
+            request.data.get('rating'),
+            request.data.get('text'),
+            known_shoe_ids=catalog.get_snapshot().by_id,
         )
+    except review_buffer.ReviewError as e:
+        return Response({'error': str(e)}, status=400)
+
+    try:
+        # Review + summary rating disimpan dalam satu transaksi biar gak selisih.
+        # Kalau REVIEW_FLUSH_INTERVAL > 0, review ditampung dulu lalu ditulis per batch.
+        if review_buffer.submit(review):
+            return Response({'message': 'Review diterima dan akan segera tampil.'}, status=202)
         return Response({'message': 'Review berhasil ditambahkan!'}, status=201)
-        
+
     except Exception as e:
         print("ERROR ASLI REVIEW:", str(e))
         return Response({'error': f'Gagal menyimpan review: {str(e)}'}, status=500)
 
 @api_view(['GET'])
 @permission_classes([AllowAny]) 
+@conditional_catalog()
 def get_all_shoes(request):
+    """
+    List katalog per halaman (keyset by shoe_id).
+    Query: ?limit=60&cursor=<dari header X-Next-Cursor>&fields=shoe_id,name,brand,img_url,slug,rating
+    """
     try:
-        # 1. Ambil SEMUA Sepatu dari Supabase (FIXED: Order by shoe_id)
-        response = supabase.table('shoes').select('*').order('shoe_id', desc=False).execute()
-        shoes = response.data if response.data else []
-
-        # 2. Ambil SEMUA Review
-        reviews_res = supabase.table('reviews').select('shoe_id, rating').execute()
-        reviews = reviews_res.data if reviews_res.data else []
-
-        # 3. Hitung Rating
-        rating_map = {}
-        for r in reviews:
-            s_id = r['shoe_id']
-            if s_id not in rating_map: rating_map[s_id] = []
-            rating_map[s_id].append(r['rating'])
-
-        # 4. Tempel Rating
-        for shoe in shoes:
-            s_id = shoe.get('shoe_id')
-            if s_id in rating_map:
-                ratings = rating_map[s_id]
-                avg = sum(ratings) / len(ratings)
-                shoe['rating'] = round(avg, 1)
-            else:
-                shoe['rating'] = 0
+        limit = pagination.parse_limit(request.GET.get('limit'))
+        fields = pagination.parse_fields(request.GET.get('fields'), SHOE_LIST_FIELDS)
+        cursor = request.GET.get('cursor')
+
+        # 1. Ambil satu halaman sepatu dari cache katalog (urut shoe_id)
+        page, next_cursor = pagination.page_after(catalog.get_snapshot(), cursor, limit)
+    except pagination.PaginationError as e:
+        return Response({'error': str(e)}, status=400)
 
-        return Response(shoes, status=200)
+    try:
+        # 2. Ambil Rating KHUSUS sepatu di halaman ini (satu query, dilewati kalau gak diminta)
+        if fields is None or 'rating' in fields:
+            rating_map = ratings.get_rating_map([shoe['shoe_id'] for shoe in page])
+        else:
+            rating_map = {}
+
+        # 3. Tempel Rating + buang kolom yang gak diminta (copy, baris katalog dipakai bareng)
+        shoes = [
+            pagination.project(dict(shoe, rating=rating_map.get(shoe['shoe_id'], 0)), fields)
+            for shoe in page
+        ]
+
+        response = Response(shoes, status=200)
+        if next_cursor:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            response['X-Next-Cursor'] = next_cursor
+            response['Link'] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+        return response
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_catalog()
 def get_shoe_by_id(request, id): # 'id' sekarang menerima string seperti "R158"
+    # Cari berdasarkan shoe_id di snapshot katalog, payload statisnya udah jadi bytes
+    snapshot = catalog.get_snapshot()
+    shoe = snapshot.by_id.get(id)
+    if shoe is None:
+        return Response({'error': f'Sepatu {id} tidak ditemukan.'}, status=404)
+
+    # Ambil Rating Real-time (satu query ke summary)
     try:
-        # Kita cari berdasarkan field 'shoe_id' di model Shoe kamu
-        shoe = Shoe.objects.get(shoe_id=id) 
-        serializer = ShoeSerializer(shoe)
-        response_data = serializer.data
-        
-        # Tambahkan field pendukung agar UI tetap rapi
-        response_data['mainImage'] = shoe.img_url
-        response_data['model'] = shoe.name
-        
-        # Ambil Rating Real-time dari Supabase
-        try:
-            rev_res = supabase.table('reviews').select('rating').eq('shoe_id', shoe.shoe_id).execute()
-            if rev_res.data:
-                avg = sum(r['rating'] for r in rev_res.data) / len(rev_res.data)
-                response_data['rating'] = round(avg, 1)
-            else:
-                response_data['rating'] = 0
-        except:
-            response_data['rating'] = 0
+        rating = ratings.get_rating(id)
+    except:
+        rating = 0
+
+    return HttpResponse(shoe_payloads.render(snapshot, shoe, {'rating': rating}), content_type='application/json')
 
-        return Response(response_data, status=200)
-    except Shoe.DoesNotExist:
-        return Response({'error': f'Sepatu {id} tidak ditemukan.'}, status=404)
\ No newline at end of file
+
+# ============================================================================
+# BAGIAN F: REKOMENDASI (Berdasarkan User Profile)
+# ============================================================================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recommendations(request):
+    try:
+        profile = request.user.profile
+    except UserProfile.DoesNotExist:
+        return Response({'error': 'Profile belum dibuat.'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    try:
+        # 1. Skor semua sepatu sekaligus (vectorized, lihat api/recommend.py)
+        matches = recommend.recommend(catalog.get_snapshot(), profile, limit=limit)
+
+        # 2. Tempel rating (satu query)
+        rating_map = ratings.get_rating_map([shoe['shoe_id'] for shoe, _ in matches])
+
+        results = [{
+            'shoe_id': shoe['shoe_id'],
+            'name': shoe.get('name'),
+            'brand': shoe.get('brand'),
+            'img_url': shoe.get('img_url'),
+            'slug': shoe.get('slug'),
+            'rating': rating_map.get(shoe['shoe_id'], 0),
+            'match_score': round(match * 100),  # persen kecocokan
+        } for shoe, match in matches]
+        return Response(results, status=200)
+    except Exception as e:
+        print("ERROR ASLI REKOMENDASI:", str(e))
+        return Response({'error': 'Couldn\'t load recommendations. Try again later.'}, status=500)
+
+
+# ============================================================================
+# BAGIAN G: ADMIN (Monitoring)
+# ============================================================================
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def supabase_stats(request):
+    """Latency, jumlah gagal & status circuit breaker client Supabase (per worker)."""
+    return Response(get_supabase_stats(), status=200)
@@ -0,0 +1,43 @@
+"""
+Pemanasan worker: load katalog + bangun semua index turunannya (plus Bloom filter
+username/email) sebelum ada request.
+
+Dipanggil gunicorn di proses master (preload_app, lihat gunicorn.conf.py), jadi
+snapshot & index-nya dibangun SEKALI lalu dipakai bareng semua worker hasil fork
+(copy-on-write), bukan dibangun ulang di request pertama tiap worker.
+"""
+import time
+
+from django.db import connections
+
+from . import availability, catalog, facets, recommend, search, shoe_payloads, similar
+
+# Index turunan snapshot yang dipakai endpoint katalog
+BUILDERS = (
+    ('search', search.get_index),
+    ('suggest', search.get_suggest_index),
+    ('facets', facets.get_index),
+    ('features', recommend.get_matrix),
+    ('similar', similar.get_table),
+    ('payloads', shoe_payloads.render_all),
+)
+
+
+def warm_up():
+    """Return {nama: durasi ms}. Koneksi DB ditutup lagi biar gak kebawa ke proses fork."""
+    timings = {}
+    try:
+        started = time.perf_counter()
+        snapshot = catalog.get_snapshot()
+        timings['catalog'] = (time.perf_counter() - started) * 1000
+        for name, builder in BUILDERS:
+            started = time.perf_counter()
+            builder(snapshot)
+            timings[name] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        availability.get_index()
+        timings['users'] = (time.perf_counter() - started) * 1000
+    finally:
+        connections.close_all()
+    return timings
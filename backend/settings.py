@@ -61,6 +61,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', #tambahan sendiri
     'whitenoise.middleware.WhiteNoiseMiddleware', #tambahan sendiri
+    'api.compression.CompressionMiddleware', # brotli/gzip, harus di atas yang baca/ubah body response
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -100,7 +101,9 @@ if DATABASE_URL:
     DATABASES = {
         'default': dj_database_url.parse(
             DATABASE_URL,
-            conn_max_age=60,       # 1. Umur koneksi cuma 60 detik (biar gak basi)
+            # 1. Koneksi di-reuse antar request selama 60 detik (biar gak basi).
+            #    Semua baca data (katalog, review, favorit) lewat koneksi ini.
+            conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 60)),
             conn_health_checks=True, # 2. Cek dulu "kabelnya" nyambung gak sebelum request
         )
     }
@@ -123,6 +126,101 @@ else:
 
 
 
+# Cache
+# Dua alias:
+# - 'default': cache biasa (token login, idempotency key job, dst), boleh kebuang kapan aja
+# - 'state'  : versi data bersama (api/versions.py) + status job (api/jobs.py), jangan
+#              sampai ke-cull random karena ketiban key-key di atas
+#
+# Produksi (lebih dari satu container / replica): set REDIS_URL. Redis dipakai bareng
+# semua host dan incr-nya atomic. Tanpa REDIS_URL pakai file cache lokal: cuma kebagi
+# antar worker di MESIN YANG SAMA (invalidate_catalog dari container lain gak nyampe),
+# dan incr-nya bukan operasi atomic.
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_DIR = os.environ.get('DJANGO_CACHE_DIR', '/tmp/sonix-cache')
+if REDIS_URL:
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': f'sonix-{alias}',
+        }
+        for alias in ('default', 'state')
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            # Default Django cuma 300 key, lewat itu sepertiga file dihapus random
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 100000))},
+        },
+        'state': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'state'),
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('STATE_CACHE_MAX_ENTRIES', 1000000))},
+        },
+    }
+
+# Katalog sepatu di-cache di memori worker (api/catalog.py)
+CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 300))  # detik
+CATALOG_GENERATION_POLL = float(os.environ.get('CATALOG_GENERATION_POLL', 1))  # detik
+CATALOG_HTTP_MAX_AGE = int(os.environ.get('CATALOG_HTTP_MAX_AGE', 60))  # Cache-Control buat browser/CDN
+
+# Cache id -> username buat nampilin review (api/users.py)
+USERNAME_CACHE_SIZE = int(os.environ.get('USERNAME_CACHE_SIZE', 10000))
+USERNAME_CACHE_TTL = int(os.environ.get('USERNAME_CACHE_TTL', 600))  # detik
+
+# Jumlah user yang bitmap favoritnya disimpan di memori worker (api/favorites.py)
+FAVORITES_CACHE_SIZE = int(os.environ.get('FAVORITES_CACHE_SIZE', 10000))
+
+# Login (api/tokens.py, api/last_login.py)
+TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 3600))  # detik, cache user_id -> token key
+LAST_LOGIN_FLUSH_INTERVAL = float(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', 5))  # detik, 0 = langsung tulis
+
+# Review ditulis per batch (api/review_buffer.py)
+REVIEW_FLUSH_INTERVAL = float(os.environ.get('REVIEW_FLUSH_INTERVAL', 0))  # detik, 0 = langsung tulis
+REVIEW_BATCH_SIZE = int(os.environ.get('REVIEW_BATCH_SIZE', 200))
+
+# Bloom filter username/email buat cek ketersediaan (api/availability.py)
+USER_BLOOM_CAPACITY = int(os.environ.get('USER_BLOOM_CAPACITY', 100000))
+USER_BLOOM_ERROR_RATE = float(os.environ.get('USER_BLOOM_ERROR_RATE', 0.01))
+USER_BLOOM_CATCHUP_WINDOW = int(os.environ.get('USER_BLOOM_CATCHUP_WINDOW', 500))  # id, buat user yang commit telat
+
+# Cache token -> user buat autentikasi tiap request (api/authentication.py)
+TOKEN_AUTH_CACHE_SIZE = int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000))
+TOKEN_AUTH_CACHE_TTL = int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 300))  # detik
+
+# HTTP client ke Supabase (api/supabase_client.py)
+SUPABASE_HTTP = {
+    'timeout': float(os.environ.get('SUPABASE_TIMEOUT', 5)),  # detik per panggilan
+    'connect_timeout': float(os.environ.get('SUPABASE_CONNECT_TIMEOUT', 2)),
+    'max_connections': int(os.environ.get('SUPABASE_MAX_CONNECTIONS', 20)),
+    'max_keepalive': int(os.environ.get('SUPABASE_MAX_KEEPALIVE', 10)),
+    'keepalive_expiry': float(os.environ.get('SUPABASE_KEEPALIVE_EXPIRY', 30)),
+    'http2': os.environ.get('SUPABASE_HTTP2', '1').lower() in ('1', 'true', 'yes'),
+    'breaker_threshold': int(os.environ.get('SUPABASE_BREAKER_THRESHOLD', 5)),  # gagal berturut-turut
+    'breaker_cooldown': float(os.environ.get('SUPABASE_BREAKER_COOLDOWN', 30)),  # detik
+}
+
+# Antrian job di dalam proses (api/jobs.py)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))  # thread per proses
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 4))
+JOB_RETRY_BACKOFF = float(os.environ.get('JOB_RETRY_BACKOFF', 1))  # detik, dikali 2 tiap retry
+JOB_RETRY_BACKOFF_MAX = float(os.environ.get('JOB_RETRY_BACKOFF_MAX', 30))
+JOB_STATUS_TTL = int(os.environ.get('JOB_STATUS_TTL', 3600))  # detik status job disimpan
+JOB_IDEMPOTENCY_TTL = int(os.environ.get('JOB_IDEMPOTENCY_TTL', 60))
+
+# Kompresi response (api/compression.py)
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # byte
+COMPRESSION_CACHE_BYTES = int(os.environ.get('COMPRESSION_CACHE_BYTES', 32 * 1024 * 1024))  # per worker
+
+# Pakai versi async (api/async_views.py) buat search & detail sepatu.
+# Cocoknya kalau jalan di ASGI (uvicorn), di WSGI tetap jalan tapi gak ada untungnya.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
+ASYNC_DB_THREADS = int(os.environ.get('ASYNC_DB_THREADS', 4))  # thread ORM per proses = maks koneksi DB
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -171,8 +269,13 @@ CORS_ALLOWED_ORIGINS = [
     "https://sonix-rush.vercel.app",
     "https://rush-sonix.my.id",
 ]
+# Header pagination katalog (get_all_shoes) harus bisa dibaca frontend
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'Link']
 AUTH_USER_MODEL = 'api.User'
 
+# Test runner yang ikut bikin tabel Supabase (managed = False) di database test
+TEST_RUNNER = 'api.test_runner.ManagedModelTestRunner'
+
 # Opsional: Pastikan ini benar untuk deployment (WhiteNoise)
 if not DEBUG:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -181,10 +284,14 @@ if not DEBUG:
 # rest framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
\ No newline at end of file
@@ -9,4 +9,8 @@ pip install -r requirements.txt
 python manage.py collectstatic --no-input
 
 # 3. Update Database (Migrate ke Supabase)
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# 4. Isi ulang ringkasan rating dari tabel reviews (tabelnya kosong habis migrate pertama,
+#    dan ngebenerin selisih kalau ada review yang masuk di luar aplikasi)
+python manage.py rebuild_rating_summary
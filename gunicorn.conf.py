@@ -0,0 +1,86 @@
+"""
+Config gunicorn buat production. Dipakai start.sh (SERVER=gunicorn atau uvicorn).
+
+- Jumlah worker & thread dihitung dari CPU yang beneran boleh dipakai container
+  (affinity + kuota cgroup, bukan jumlah CPU host) dan dibatasi GUNICORN_MAX_WORKERS.
+  Tiap worker punya katalog/index sendiri + koneksi Postgres per thread, jadi
+  kebanyakan worker = koneksi Supabase habis. WEB_CONCURRENCY tetap menang kalau di-set.
+- preload_app: Django + katalog + index dibangun sekali di master sebelum fork,
+  jadi semua worker langsung panas dan memorinya dibagi copy-on-write.
+- max_requests + jitter: worker di-restart bergiliran (graceful) biar memori
+  gak numpuk, dan gak semua worker restart barengan.
+
+Bandingin sama runserver:
+    python manage.py bench_http --url http://127.0.0.1:8000/api/shoes/ --requests 2000 --concurrency 32
+"""
+import math
+import os
+
+
+def _cgroup_cpu_limit():
+    """Kuota CPU dari cgroup (v2 lalu v1), None kalau gak dibatasi."""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus():
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(cpus, 1)
+
+
+SERVER = os.environ.get('SERVER', 'gunicorn')
+CPUS = available_cpus()
+MAX_WORKERS = int(os.environ.get('GUNICORN_MAX_WORKERS', 8))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+if SERVER == 'uvicorn':
+    # ASGI (api/async_views.py): satu event loop per worker, gak butuh thread
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(CPUS + 1, MAX_WORKERS)))
+else:
+    # WSGI: thread per worker, enak buat request yang banyak nunggu DB
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(CPUS * 2 + 1, MAX_WORKERS)))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None  # heartbeat gak nyentuh disk
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Master udah load app (preload) -> panasin katalog sebelum worker di-fork."""
+    if os.environ.get('WARMUP_CATALOG', '1') != '1':
+        return
+    try:
+        from api.warmup import warm_up
+        timings = warm_up()
+        server.log.info('Catalog warm-up: %s', ', '.join(f'{name} {ms:.0f}ms' for name, ms in timings.items()))
+    except Exception:
+        # Gagal warm-up (misal DB belum siap) bukan alasan buat gak nyala
+        server.log.exception('Catalog warm-up failed, workers will load it on first request')
@@ -0,0 +1,26 @@
+#!/usr/bin/env bash
+# Jalankan server sesuai env SERVER:
+#   gunicorn  (default) -> WSGI, worker gthread, config di gunicorn.conf.py
+#   uvicorn             -> ASGI lewat gunicorn + UvicornWorker (view async aktif)
+#   runserver           -> server development Django (jangan buat production)
+set -o errexit
+
+case "${SERVER:-gunicorn}" in
+  gunicorn)
+    exec gunicorn backend.wsgi:application -c gunicorn.conf.py
+    ;;
+  uvicorn)
+    export ASYNC_READ_VIEWS="${ASYNC_READ_VIEWS:-1}"
+    # Saran docs Django buat ASGI: matiin koneksi persisten, thread ORM yang jalanin
+    # query gak nutup koneksinya sendiri (lihat api/async_views.py)
+    export DB_CONN_MAX_AGE="${DB_CONN_MAX_AGE:-0}"
+    exec gunicorn backend.asgi:application -c gunicorn.conf.py
+    ;;
+  runserver)
+    exec python manage.py runserver "0.0.0.0:${PORT:-8000}"
+    ;;
+  *)
+    echo "SERVER harus gunicorn, uvicorn, atau runserver (dapat: ${SERVER})" >&2
+    exit 1
+    ;;
+esac